@@ -27,7 +27,7 @@ SECRET_KEY = config('DJANGO_SECRET_KEY')
 DEBUG = config('DEBUG', default=True, cast=bool)
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1','192.168.1.9']
-GEMINI_API_KEY = config('GEMINI_API_KEY')
+GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
 
 # Application definition
 
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'inventory.timing.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.middleware.gzip.GZipMiddleware',
@@ -59,7 +60,7 @@ MIDDLEWARE = [
 GZIP_MIN_LENGTH = 200
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'inventory.pagination.InventoryPagination',
     'PAGE_SIZE': 25,
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -72,14 +73,86 @@ REST_FRAMEWORK = {
 
 
 # REDIS CACHES SECTION
-CACHES = {
-    "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": "redis://127.0.0.1:6379/1",  # Redis instance
-        "OPTIONS": {
-            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+# CACHE_BACKEND=locmem gives a per-process stand-in when Redis isn't available
+if config('CACHE_BACKEND', default='redis') == 'locmem':
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         }
     }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": config('REDIS_URL', default="redis://127.0.0.1:6379/1"),  # Redis instance
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+                # Treat an unreachable Redis as a cache miss instead of failing requests
+                "IGNORE_EXCEPTIONS": True,
+            }
+        }
+    }
+
+# Seconds list/detail API responses stay cached (0 disables the response cache)
+API_CACHE_TTL = config('API_CACHE_TTL', default=300, cast=int)
+
+# Seconds a barcode/SKU scanner lookup stays cached (0 disables the cache)
+PRODUCT_LOOKUP_CACHE_TTL = config('PRODUCT_LOOKUP_CACHE_TTL', default=300, cast=int)
+
+# Seconds the dashboard summary is served from cache (0 disables the cache)
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=30, cast=int)
+
+# Seconds an AI inventory report is reused while its input aggregates are unchanged (0 disables the cache)
+INVENTORY_REPORT_CACHE_TTL = config('INVENTORY_REPORT_CACHE_TTL', default=3600, cast=int)
+
+# Dotted path of the AI report backend; inventory.analysers.LocalAnalyser works offline without the Gemini SDK
+INVENTORY_ANALYSER = config('INVENTORY_ANALYSER', default='inventory.gemini_ai_analyser.GeminiAnalyser')
+
+# Products (most urgent first) included verbatim in the AI report prompt
+INVENTORY_REPORT_SAMPLE_SIZE = config('INVENTORY_REPORT_SAMPLE_SIZE', default=25, cast=int)
+
+# Catalogs larger than this are analysed per category (map-reduce) instead of in one prompt
+INVENTORY_REPORT_CHUNK_THRESHOLD = config('INVENTORY_REPORT_CHUNK_THRESHOLD', default=500, cast=int)
+
+# Concurrent analyser calls while analysing categories
+INVENTORY_REPORT_CHUNK_WORKERS = config('INVENTORY_REPORT_CHUNK_WORKERS', default=4, cast=int)
+
+# Approximate prompt tokens per category chunk; bounds how many products each chunk sample holds
+INVENTORY_REPORT_CHUNK_TOKENS = config('INVENTORY_REPORT_CHUNK_TOKENS', default=4000, cast=int)
+
+# Upper bound on products fetched per category before the token budget is applied
+INVENTORY_REPORT_CHUNK_SAMPLE_MAX = config('INVENTORY_REPORT_CHUNK_SAMPLE_MAX', default=200, cast=int)
+
+# Background threads generating AI reports for POST /api/inventory-report/ (0 runs jobs inline)
+INVENTORY_REPORT_WORKERS = config('INVENTORY_REPORT_WORKERS', default=2, cast=int)
+
+# Seconds a report job's status and result stay retrievable
+INVENTORY_REPORT_JOB_TTL = config('INVENTORY_REPORT_JOB_TTL', default=3600, cast=int)
+
+# Seconds a queued or running report job may take before it counts as failed
+# (e.g. its worker process died) and a new request starts a fresh job
+INVENTORY_REPORT_JOB_TIMEOUT = config('INVENTORY_REPORT_JOB_TIMEOUT', default=300, cast=int)
+
+# Per-request Server-Timing header and JSON timing logs (off: the middleware is dropped at startup)
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=False, cast=bool)
+
+# Matching products loaded per query by the run_workflows sweep
+WORKFLOW_SWEEP_CHUNK_SIZE = config('WORKFLOW_SWEEP_CHUNK_SIZE', default=1000, cast=int)
+
+# Seconds the run_workflows lock lives, so a crashed scheduler cannot hold it forever
+WORKFLOW_LOCK_TTL = config('WORKFLOW_LOCK_TTL', default=900, cast=int)
+
+# LOGGING SECTION
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'inventory.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'inventory.workflows': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 # CORS_ORIGIN_SECTION
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, PurchaseOrder, Category, OrderItem, Customer, Order, Bill, WorkflowRule, Alert
+from .models import Product, PurchaseOrder, Category, OrderItem, Customer, Order, Bill, WorkflowRule, Alert, StockMovement, StockSnapshot
 # Register your models here.
 admin.site.register(Product)
 admin.site.register(PurchaseOrder)
@@ -9,4 +9,6 @@ admin.site.register(OrderItem)
 admin.site.register(Customer)
 admin.site.register(Bill)
 admin.site.register(WorkflowRule)
-admin.site.register(Alert)
\ No newline at end of file
+admin.site.register(Alert)
+admin.site.register(StockMovement)
+admin.site.register(StockSnapshot)
\ No newline at end of file
@@ -0,0 +1,128 @@
+# inventory/analysers.py
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_backends = {}
+
+
+class AnalyserBackend:
+    """
+    Turns an inventory summary into a report matching InventoryReportSerializer.
+
+    Backends are named by dotted path in settings.INVENTORY_ANALYSER and
+    imported on first use, so an unused backend's dependencies are never loaded.
+    """
+
+    def analyze(self, inventory_summary):
+        """
+        Args:
+            inventory_summary (dict): See `inventory.reports.build_report_input`.
+
+        Returns:
+            dict: The report, or {"error": "..."} on failure.
+        """
+        raise NotImplementedError
+
+
+class LocalAnalyser(AnalyserBackend):
+    """
+    Deterministic rule-based report. Needs no network, key or SDK, so it
+    suits offline development, tests and a fallback when Gemini is down.
+    """
+
+    def analyze(self, inventory_summary):
+        total = inventory_summary['total_products']
+        low = inventory_summary['low_stock_items']
+        value = inventory_summary['total_value']
+        categories = inventory_summary['categories']
+        low_ratio = low / total if total else 0
+
+        urgent = [p for p in inventory_summary['sample_products'] if p['quantity'] <= p['min_stock']]
+        out_of_stock = [p for p in urgent if p['quantity'] == 0]
+        recommendations = [
+            {
+                'product_id': p['id'],
+                'suggested_qty': max(2 * p['min_stock'] - p['quantity'], 1),
+                'urgency': 'high' if p['quantity'] == 0 else 'medium' if 2 * p['quantity'] <= p['min_stock'] else 'low',
+            }
+            for p in urgent[:5]
+        ]
+
+        by_value = max(categories, key=lambda name: categories[name]['value'], default=None)
+        by_low = max(categories, key=lambda name: categories[name]['low'], default=None)
+        trends = []
+        if by_value:
+            trends.append(f"{by_value} holds the most stock value (₹{categories[by_value]['value']:,.2f}).")
+        if by_low and categories[by_low]['low']:
+            trends.append(
+                f"{by_low} has the most low-stock products "
+                f"({categories[by_low]['low']} of {categories[by_low]['count']})."
+            )
+
+        action_items = []
+        if out_of_stock:
+            action_items.append(f"Restock {len(out_of_stock)} out-of-stock products immediately.")
+        if urgent:
+            names = ', '.join(p['name'] for p in urgent[:3])
+            action_items.append(f"Reorder the {low} low-stock products, starting with {names}.")
+        if by_low and categories[by_low]['low']:
+            action_items.append(f"Review minimum stock levels in {by_low}.")
+        if by_value:
+            action_items.append(f"Check for slow-moving stock in {by_value} to free up capital.")
+        action_items.append("Keep minimum stock levels aligned with recent sales.")
+
+        return {
+            'summary': (
+                f"{total} products worth ₹{value:,.2f}; {low} ({low_ratio:.0%}) are at or below minimum stock."
+            ),
+            'low_stock_items': low,
+            'total_value': value,
+            'reorder_recommendations': recommendations,
+            'trends': ' '.join(trends) or "Not enough data to identify trends.",
+            'risk_level': 'high' if low_ratio > 0.2 else 'medium' if low_ratio > 0.05 else 'low',
+            'action_items': action_items[:5],
+        }
+
+
+def get_analyser():
+    """
+    The configured analyser backend, imported and instantiated on first use.
+    """
+    path = settings.INVENTORY_ANALYSER
+    backend = _backends.get(path)
+    if backend is None:
+        backend = _backends[path] = import_string(path)()
+    return backend
+
+
+def analyze_inventory(inventory_summary):
+    """
+    Analyse an inventory summary with the configured backend.
+    """
+    return get_analyser().analyze(inventory_summary)
+
+
+def summarize_products(products_data, sample_size=5):
+    """
+    Build `analyze_inventory` input from a plain list of product dicts.
+
+    Args:
+        products_data (list): List of dicts with fields like
+                              [{'id':1, 'name':'Laptop', 'quantity':5, 'price':1000,
+                                'min_stock':10, 'category':'Electronics'}, ...]
+    """
+    categories = {}
+    for p in products_data:
+        cat = p.get('category') or 'Uncategorized'
+        entry = categories.setdefault(cat, {'count': 0, 'low': 0, 'value': 0})
+        entry['count'] += 1
+        entry['low'] += p['quantity'] <= p['min_stock']
+        entry['value'] += p['quantity'] * p['price']
+
+    return {
+        'total_products': len(products_data),
+        'low_stock_items': sum(c['low'] for c in categories.values()),
+        'total_value': sum(c['value'] for c in categories.values()),
+        'categories': categories,
+        'sample_products': sorted(products_data, key=lambda p: p['quantity'] - p['min_stock'])[:sample_size],
+    }
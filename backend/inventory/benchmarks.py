@@ -0,0 +1,222 @@
+# inventory/benchmarks.py
+import json
+import math
+import statistics
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Alert, Category, Product
+
+BUDGET_FILE = Path(__file__).with_name('benchmark_budgets.json')
+
+# Benchmarks always run against a private cache so cold paths are measured
+# and the configured cache (Redis in production) is never touched.
+BENCHMARK_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Routes left out of the automatic sweep, with the reason
+SKIPPED_ROUTES = {
+    'inventory-report-job': 'needs a job id from POST inventory-report',
+}
+
+# Query strings needed for an action to do real work (keyed by route name).
+# {placeholders} are filled from the seeded data; case names keep the template.
+ACTION_QUERIES = {
+    'product-lookup': '?sku={sku}',
+    'product-export': '?format=csv',
+    'order-export': '?format=ndjson',
+    'bill-export': '?format=csv',
+}
+
+# Filtered list variants measured on top of the plain routes
+FILTER_CASES = [
+    ('product-list', '?stock_status=low'),
+    ('product-list', '?category={category}'),
+    ('product-list', '?search={word}'),
+    ('product-list', '?paginator=cursor'),
+    ('product-total-value', '?group_by=category,is_active'),
+    ('customer-list', '?search=example'),
+    ('customer-list', '?type=vendor'),
+    ('order-list', '?status=delivered'),
+    ('order-list', '?paginator=cursor'),
+    ('bill-list', '?status=unpaid'),
+]
+
+# Write endpoints: (route name, method, detail model or None, payload factory).
+# Each run is rolled back.
+WRITE_CASES = [
+    ('product-adjust-stock', 'post', None, lambda: [
+        {'product_id': pk, 'delta': 1} for pk in Product.objects.order_by('pk').values_list('pk', flat=True)[:10]
+    ]),
+    ('alert-mark-read', 'patch', Alert, lambda: {}),
+]
+
+
+class Case:
+    def __init__(self, name, method, route, args=(), query='', payload=None):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.args = args
+        self.query = query
+        self.payload = payload
+
+    @property
+    def url(self):
+        return reverse(self.route, args=self.args) + self.query
+
+
+def _first_pk(viewset):
+    return viewset.queryset.model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+
+
+def collect_cases():
+    """
+    One case per routed endpoint and GET action, plus the filter and write cases.
+
+    Routes are discovered from the router, so a new endpoint is benchmarked
+    (and needs a budget) without being listed here.
+    """
+    from .urls import router, urlpatterns
+
+    placeholders = {
+        'sku': Product.objects.order_by('pk').values_list('sku', flat=True).first(),
+        'category': Category.objects.order_by('pk').values_list('pk', flat=True).first(),
+        # A word from a seeded product name, so the search case always has matches
+        'word': (Product.objects.order_by('pk').values_list('name', flat=True).first() or '').split(' ')[0],
+    }
+    cases = []
+    for prefix, viewset, basename in router.registry:
+        pk = _first_pk(viewset)
+        cases.append(Case(f'{basename}-list', 'get', f'{basename}-list'))
+        if pk is not None:
+            cases.append(Case(f'{basename}-detail', 'get', f'{basename}-detail', args=(pk,)))
+        for extra in viewset.get_extra_actions():
+            route = f'{basename}-{extra.url_name}'
+            if 'get' not in extra.mapping or (extra.detail and pk is None):
+                continue
+            query = ACTION_QUERIES.get(route, '').format(**placeholders)
+            cases.append(Case(route, 'get', route, args=(pk,) if extra.detail else (), query=query))
+
+    for pattern in urlpatterns:
+        if getattr(pattern, 'name', None) and pattern.name not in SKIPPED_ROUTES:
+            cases.append(Case(pattern.name, 'get', pattern.name))
+
+    for route, query in FILTER_CASES:
+        cases.append(Case(f'{route}{query}', 'get', route, query=query.format(**placeholders)))
+
+    for route, method, model, payload in WRITE_CASES:
+        args = (model._default_manager.order_by('pk').values_list('pk', flat=True)[0],) if model else ()
+        cases.append(Case(f'{method.upper()} {route}', method, route, args=args, payload=payload()))
+    return cases
+
+
+def measure(client, case, repeat):
+    """
+    Run a case `repeat` times on a cold cache; returns (status, queries, timings in ms).
+    """
+    timings, queries, status_code = [], None, None
+    for _ in range(repeat):
+        cache.clear()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, case.method)(case.url, case.payload, format='json')
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)  # keep write cases repeatable
+        status_code = response.status_code
+        queries = len(captured) if queries is None else max(queries, len(captured))
+    return status_code, queries, timings
+
+
+def load_budgets(path=BUDGET_FILE):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def run_benchmarks(budgets=None, repeat=3, scale=None, seed=None, check_time=True):
+    """
+    Seed the benchmark dataset, measure every case and compare with the budgets.
+
+    Must run against a disposable database: the dataset replaces all
+    inventory rows. With `check_time` off only query budgets are enforced,
+    for runs whose timings are not comparable (e.g. the test suite).
+
+    Returns:
+        dict: Machine-readable report with per-case results and an overall
+              "passed" flag. A case fails when it errors, exceeds its query or
+              time budget, or has no budget entry.
+    """
+    budgets = budgets or load_budgets()
+    dataset = dict(budgets['dataset'])
+    if scale is not None:
+        dataset['scale'] = scale
+    if seed is not None:
+        dataset['seed'] = seed
+
+    # The offline analyser keeps the AI report endpoint measurable without Gemini
+    with override_settings(CACHES=BENCHMARK_CACHES, INVENTORY_ANALYSER='inventory.analysers.LocalAnalyser'):
+        call_command('seed', '--scale', str(dataset['scale']), '--seed', str(dataset['seed']), stdout=StringIO())
+        user, _ = User.objects.get_or_create(username='benchmark')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        results = []
+        for case in collect_cases():
+            status_code, queries, timings = measure(client, case, repeat)
+            budget = budgets['endpoints'].get(case.name)
+            median = statistics.median(timings)
+            violations = []
+            if status_code >= 400:
+                violations.append(f'status {status_code}')
+            if budget is None:
+                violations.append('no budget')
+            else:
+                if queries > budget['queries']:
+                    violations.append(f"{queries} queries > budget {budget['queries']}")
+                if check_time and median > budget['ms']:
+                    violations.append(f"{median:.1f}ms > budget {budget['ms']}ms")
+            results.append({
+                'name': case.name,
+                'method': case.method.upper(),
+                'url': case.url,
+                'status': status_code,
+                'queries': queries,
+                'median_ms': round(median, 2),
+                'max_ms': round(max(timings), 2),
+                'budget': budget,
+                'violations': violations,
+            })
+
+    return {
+        'dataset': dataset,
+        'repeat': repeat,
+        'passed': not any(result['violations'] for result in results),
+        'results': results,
+    }
+
+
+def budgets_from_report(report, headroom=3, floor_ms=50):
+    """
+    Build a budget file from a report: exact query counts and `headroom`x the median time.
+    """
+    return {
+        'dataset': report['dataset'],
+        'endpoints': {
+            result['name']: {
+                'queries': result['queries'],
+                'ms': max(floor_ms, math.ceil(result['median_ms'] * headroom / 10) * 10),
+            }
+            for result in report['results']
+        },
+    }
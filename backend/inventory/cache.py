@@ -0,0 +1,137 @@
+# inventory/cache.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+# Models whose every write bumps their version (signals.py, plus explicit
+# bumps after bulk writes). Responses built only from these can be
+# validated by their versions alone; registered in signals.py.
+VERSIONED_MODELS = set()
+
+
+def _version_key(model):
+    return f"inventory:version:{model._meta.label_lower}"
+
+
+def get_model_versions(models):
+    """
+    Current cache versions for several models, in one cache round trip.
+
+    Cached entries embed these numbers in their keys, so bumping a model's
+    version invalidates every entry derived from it at once.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from a timestamp so an evicted counter never reuses old keys.
+            version = int(time.time() * 1000)
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def get_model_version(model):
+    return get_model_versions([model])[0]
+
+
+def _incr_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def bump_model_version(model):
+    """
+    Invalidate all cached entries derived from `model`.
+
+    Inside a transaction the version is bumped again on commit, so a reader
+    that cached pre-commit data under the new version cannot keep serving it.
+    """
+    key = _version_key(model)
+    _incr_version(key)
+    transaction.on_commit(lambda: _incr_version(key))
+
+
+def product_lookup_key(field, value):
+    """
+    Cache key for a scanner lookup of a single product by barcode or SKU.
+
+    Includes the Category version too, since the cached data embeds `category_name`.
+    """
+    from .models import Category, Product
+    versions = ':'.join(str(version) for version in get_model_versions([Product, Category]))
+    return f"inventory:product-lookup:{versions}:{field}:{value}"
+
+
+def _count(namespace, outcome):
+    key = f"inventory:response-stats:{namespace}:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def response_cache_stats(namespaces):
+    """
+    Hit/miss counters of the response cache, per viewset namespace.
+    """
+    keys = {
+        (ns, outcome): f"inventory:response-stats:{ns}:{outcome}"
+        for ns in namespaces for outcome in ('hit', 'miss')
+    }
+    values = cache.get_many(keys.values())
+    return {
+        ns: {outcome: values.get(keys[(ns, outcome)], 0) for outcome in ('hit', 'miss')}
+        for ns in namespaces
+    }
+
+
+class CachedResponseMixin:
+    """
+    Serve `list` and `retrieve` from the cache.
+
+    Keys combine the viewset namespace, the versions of every model in
+    `cache_dependencies` (bumped by post_save/post_delete signals), the
+    requesting user and the full request URL, so a write to any dependency
+    invalidates exactly the responses built from it.
+    """
+    cache_namespace = None
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(request, super().retrieve, *args, **kwargs)
+
+    def _cached_response(self, request, view, *args, **kwargs):
+        ttl = settings.API_CACHE_TTL
+        if not ttl:
+            return view(request, *args, **kwargs)
+
+        namespace = self.cache_namespace or self.basename
+        versions = get_model_versions([self.queryset.model, *self.cache_dependencies])
+        scope = request.user.pk if request.user.is_authenticated else 'anon'
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"inventory:response:{namespace}:{self.action}:{'.'.join(map(str, versions))}:{scope}:{url}"
+
+        data = cache.get(key)
+        if data is not None:
+            _count(namespace, 'hit')
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(namespace, 'miss')
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, ttl)
+        response['X-Cache'] = 'MISS'
+        return response
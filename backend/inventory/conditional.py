@@ -0,0 +1,77 @@
+# inventory/conditional.py
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import VERSIONED_MODELS, get_model_versions
+
+
+class ConditionalGetMixin:
+    """
+    Answer `list` and `retrieve` with 304 Not Modified when the client's
+    validators still match, without fetching or serializing any rows.
+
+    Collections are validated by the cache versions of the model and its
+    dependencies when all of them are versioned (no database query, so a
+    cached response is served without touching the database), otherwise by
+    max(`updated_at`) plus the row count of the filtered queryset. Single
+    objects are validated by their own `updated_at`. Models in
+    `cache_dependencies` (data nested or aggregated into the response)
+    contribute their cache versions to the ETag; such responses can change
+    while the row's `updated_at` stands still, so they are validated by
+    ETag only.
+    """
+    cache_dependencies = ()
+
+    def list(self, request, *args, **kwargs):
+        models = [self.queryset.model, *self.cache_dependencies]
+        if VERSIONED_MODELS.issuperset(models):
+            # The URL carries every filter, so it plus the versions identifies the response
+            etag = self._make_etag(request, models=models)
+            return self._conditional(request, etag, None, None, super().list, *args, **kwargs)
+
+        rows = self.filter_queryset(self.queryset.model._default_manager.all())
+        stats = rows.aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+        etag = self._make_etag(request, stats['last_modified'], stats['count'])
+        # Deletions don't move max(updated_at), so collections only honour the ETag
+        return self._conditional(request, etag, None, stats['last_modified'], super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        try:
+            last_modified = self.queryset.model._default_manager.filter(
+                **{self.lookup_field: kwargs[lookup]}
+            ).values_list('updated_at', flat=True).first()
+        except (ValueError, TypeError, ValidationError):
+            # Malformed keys (e.g. /products/abc/) get DRF's usual 404
+            last_modified = None
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        etag = self._make_etag(request, last_modified)
+        if self.cache_dependencies:
+            return self._conditional(request, etag, None, None, super().retrieve, *args, **kwargs)
+        return self._conditional(request, etag, last_modified, last_modified, super().retrieve, *args, **kwargs)
+
+    def _make_etag(self, request, *validators, models=None):
+        models = self.cache_dependencies if models is None else models
+        versions = get_model_versions(models) if models else []
+        parts = [request.get_full_path(), *(str(v) for v in validators), *(str(v) for v in versions)]
+        return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+
+    def _conditional(self, request, etag, check_modified, last_modified, view, *args, **kwargs):
+        # HTTP dates have one-second resolution
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=timestamp if check_modified else None
+        )
+        if not_modified is not None:
+            return not_modified
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
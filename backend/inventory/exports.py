@@ -0,0 +1,93 @@
+# inventory/exports.py
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Negotiates `?format=csv`. Exports stream their own body, so this only
+    renders error payloads.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class NDJSONRenderer(CSVRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def _csv_chunks(headers, rows, batch_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(headers, rows, batch_size):
+    encoder = DjangoJSONEncoder()
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(headers, row))))
+        if len(lines) == batch_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(queryset, columns, export_format, filename, chunk_size=2000):
+    """
+    Stream `queryset` as CSV or NDJSON without materialising it.
+
+    Args:
+        queryset (QuerySet): Rows to export; read with a server-side cursor.
+        columns (list): (header, lookup) pairs passed to `values_list`.
+        export_format (str): 'csv' or 'ndjson'.
+        filename (str): Download name without extension.
+    """
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=chunk_size)
+    if export_format == 'ndjson':
+        body, content_type = _ndjson_chunks(headers, rows, chunk_size), NDJSONRenderer.media_type
+    else:
+        body, content_type = _csv_chunks(headers, rows, chunk_size), CSVRenderer.media_type
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+class ExportMixin:
+    """
+    Adds `GET <resource>/export/?format=csv|ndjson` honouring the list filters.
+    """
+    export_columns = ()
+
+    def get_export_queryset(self):
+        return self.filter_queryset(self.queryset.model._default_manager.all())
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Stream every matching row as CSV (default) or NDJSON.
+        """
+        return stream_export(
+            self.get_export_queryset(), self.export_columns,
+            request.accepted_renderer.format, self.basename
+        )
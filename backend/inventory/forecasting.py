@@ -0,0 +1,220 @@
+# inventory/forecasting.py
+import math
+from datetime import datetime, time, timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from django.db.models import DateField, Func, IntegerField, Sum, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import OrderItem
+from .stock import COMMITTED_STATUSES
+
+# Defaults for GET /api/products/reorder-suggestions/ (all overridable per request)
+FORECAST_DEFAULTS = {
+    'method': 'ema',        # 'ema' (exponential smoothing) or 'sma' (moving average)
+    'history_days': 730,    # sales history considered
+    'window_days': 28,      # moving-average and demand-variability window
+    'alpha': 0.3,           # smoothing factor for 'ema'
+    'lead_time_days': 7,    # supplier lead time
+    'cover_days': 14,       # demand a reorder should cover beyond the reorder point
+    'service_level': 0.95,  # probability of not stocking out during lead time
+}
+
+# Allowed range of each day-count option (bounds the history arrays and the date arithmetic)
+FORECAST_DAY_LIMITS = {
+    'history_days': (1, 3650),
+    'window_days': (1, 3650),
+    'lead_time_days': (0, 365),
+    'cover_days': (0, 365),
+}
+
+
+# Rows fetched from the cursor per round trip when loading sales history
+FETCH_SIZE = 10000
+
+
+class DaysSince(Func):
+    """
+    Whole days from `start` to the local date of a datetime expression,
+    computed by the database.
+    """
+    output_field = IntegerField()
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+
+    def __init__(self, expression, start):
+        super().__init__(TruncDate(expression), Value(start, output_field=DateField()))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        day, start = self.get_source_expressions()
+        if not settings.USE_TZ or connection.timezone_name == timezone.get_current_timezone_name():
+            # Values are stored in the current zone, so SQLite's own date()
+            # gives the local day without TruncDate's per-row Python function
+            day = Func(day.get_source_expressions()[0], function='date', output_field=DateField())
+        sql, params = compiler.compile(day)
+        start_sql, start_params = compiler.compile(start)
+        return f'CAST(ROUND(julianday({sql}) - julianday({start_sql})) AS INTEGER)', (*params, *start_params)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='DATEDIFF', template='%(function)s(%(expressions)s)',
+                           arg_joiner=', ', **extra_context)
+
+
+def load_daily_sales(products, product_ids, start, days):
+    """
+    Daily units sold per product since `start`, as sparse NumPy arrays.
+
+    Only days with sales come back from the database (one grouped query, with
+    the day offset computed in SQL), so memory follows the number of
+    (product, day) pairs with sales rather than products x days. Rows are
+    copied from the cursor straight into integer arrays, skipping model
+    field converters.
+
+    Args:
+        products (QuerySet): Products to forecast; applied as an SQL subquery.
+        product_ids (np.ndarray): Their sorted ids.
+        start (date): First day of the history.
+        days (int): Length of the history in days.
+
+    Returns:
+        tuple: (product_index, day_index, units) arrays of equal length.
+    """
+    # Compiled on its own so raw filters (full-text search) keep their table names
+    product_subquery = RawSQL(*products.order_by().values('pk').query.sql_with_params())
+    rows = (
+        OrderItem.objects.filter(
+            product__in=product_subquery,
+            order__type='sales',
+            order__status__in=COMMITTED_STATUSES['sales'],
+            order__created_at__gte=timezone.make_aware(datetime.combine(start, time.min)),
+        )
+        .annotate(day=DaysSince('order__created_at', start))
+        .values_list('product_id', 'day')
+        .annotate(units=Sum('quantity'))
+        .order_by()
+    )
+    sql, params = rows.query.sql_with_params()
+    sales = np.empty((FETCH_SIZE, 3), dtype=np.int64)
+    count = 0
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while batch := cursor.fetchmany(FETCH_SIZE):
+            if count + len(batch) > len(sales):
+                grown = np.empty((2 * len(sales), 3), dtype=np.int64)
+                grown[:count] = sales[:count]
+                sales = grown
+            sales[count:count + len(batch)] = batch
+            count += len(batch)
+
+    product, day_index, units = sales[:count].T
+    # Later days (future-dated orders) fall outside the window
+    keep = day_index < days
+    return np.searchsorted(product_ids, product[keep]), day_index[keep], units[keep].astype(np.float64)
+
+
+def forecast_demand(product_index, day_index, units, n_products, days, method, window_days, alpha):
+    """
+    Expected daily demand and its standard deviation for every product in one
+    vectorised pass over the sparse sales arrays.
+
+    Days without sales count as zero demand. For 'ema' the smoothed level
+    after the last day is sum(alpha * (1 - alpha) ** age * units), starting
+    from a level of zero.
+
+    Returns:
+        tuple: (daily_demand, daily_std) arrays of length `n_products`.
+    """
+    recent = day_index >= days - window_days
+    window_sum = np.bincount(product_index[recent], weights=units[recent], minlength=n_products)
+    window_sq = np.bincount(product_index[recent], weights=units[recent] ** 2, minlength=n_products)
+    mean = window_sum / window_days
+    std = np.sqrt(np.maximum(window_sq / window_days - mean ** 2, 0))
+
+    if method == 'sma':
+        return mean, std
+    age = days - 1 - day_index
+    weights = alpha * (1 - alpha) ** age
+    level = np.bincount(product_index, weights=units * weights, minlength=n_products)
+    return level, std
+
+
+def reorder_plan(quantity, min_stock, daily_demand, daily_std, lead_time_days, cover_days, service_level):
+    """
+    Safety stock, reorder point and suggested order quantity per product.
+
+    The reorder point is lead-time demand plus safety stock, never below the
+    product's own `min_stock`. Products at or under it get an order that
+    restores stock to the reorder point plus `cover_days` of demand.
+
+    Returns:
+        dict: Arrays keyed safety_stock, reorder_point, suggested_qty, days_of_cover.
+    """
+    z = NormalDist().inv_cdf(service_level)
+    safety_stock = z * daily_std * math.sqrt(lead_time_days)
+    reorder_point = np.maximum(daily_demand * lead_time_days + safety_stock, min_stock)
+    order_up_to = reorder_point + daily_demand * cover_days
+    suggested = np.where(quantity <= reorder_point, np.ceil(np.maximum(order_up_to - quantity, 0)), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(daily_demand > 0, quantity / daily_demand, np.inf)
+    return {
+        'safety_stock': safety_stock,
+        'reorder_point': reorder_point,
+        'suggested_qty': suggested,
+        'days_of_cover': days_of_cover,
+    }
+
+
+def reorder_suggestions(products, **options):
+    """
+    Forecast demand from sales history and list products that need reordering.
+
+    Args:
+        products (QuerySet): Products to consider (e.g. the filtered list queryset).
+        **options: Overrides for FORECAST_DEFAULTS.
+
+    Returns:
+        list: One dict per product at or below its reorder point, lowest days
+              of cover first.
+    """
+    params = {**FORECAST_DEFAULTS, **options}
+    rows = list(products.order_by('id').values_list('id', 'sku', 'name', 'quantity', 'min_stock'))
+    if not rows:
+        return []
+    ids, skus, names, quantity, min_stock = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    quantity = np.array(quantity, dtype=np.float64)
+    min_stock = np.array(min_stock, dtype=np.float64)
+
+    days = params['history_days']
+    start = timezone.localdate() - timedelta(days=days - 1)
+    product_index, day_index, units = load_daily_sales(products, ids, start, days)
+    demand, std = forecast_demand(
+        product_index, day_index, units, len(ids), days,
+        params['method'], min(params['window_days'], days), params['alpha'],
+    )
+    plan = reorder_plan(
+        quantity, min_stock, demand, std,
+        params['lead_time_days'], params['cover_days'], params['service_level'],
+    )
+
+    due = np.flatnonzero(plan['suggested_qty'] > 0)
+    due = due[np.lexsort((-plan['suggested_qty'][due], plan['days_of_cover'][due]))]
+    return [
+        {
+            'product_id': int(ids[i]),
+            'sku': skus[i],
+            'name': names[i],
+            'quantity': int(quantity[i]),
+            'daily_demand': round(float(demand[i]), 3),
+            'safety_stock': round(float(plan['safety_stock'][i]), 2),
+            'reorder_point': round(float(plan['reorder_point'][i]), 2),
+            'suggested_qty': int(plan['suggested_qty'][i]),
+            'days_of_cover': None if math.isinf(plan['days_of_cover'][i]) else round(float(plan['days_of_cover'][i]), 1),
+        }
+        for i in due
+    ]
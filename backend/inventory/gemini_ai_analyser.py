@@ -1,60 +1,72 @@
-# inventory/utils/gemini_analyzer.py
-from google import genai
-from google.genai import types
+# inventory/gemini_ai_analyser.py
 from django.conf import settings
 import json
+import logging
 import os
 
+from .analysers import AnalyserBackend, summarize_products
+from .timing import timed
+
+logger = logging.getLogger(__name__)
+
 # ----------------------------------------------------------------------
-# Initialize Gemini Client
+# Gemini Client (built on first use)
 # ----------------------------------------------------------------------
 
-GEMINI_API_KEY = getattr(settings, 'GEMINI_API_KEY', None)
-if not GEMINI_API_KEY:
-    GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
+_client = None
+
+
+def get_client():
+    """
+    Return the shared Gemini client, creating it on first call.
+
+    The SDK import and client setup are deferred so that Django startup,
+    management commands and tests never pay for them (or need a key).
+    Returns None when the key is missing or the client cannot be built.
+    """
+    global _client
+    if _client is not None:
+        return _client
 
-if not GEMINI_API_KEY:
-    raise ValueError("❌ GEMINI_API_KEY not configured in Django settings or environment variables.")
+    api_key = getattr(settings, 'GEMINI_API_KEY', None) or os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        logger.warning("GEMINI_API_KEY not configured in Django settings or environment variables.")
+        return None
 
-try:
-    client = genai.Client(api_key=GEMINI_API_KEY)
-except Exception as e:
-    print(f"⚠️ Error initializing Gemini Client: {e}")
-    client = None
+    try:
+        from google import genai
+        _client = genai.Client(api_key=api_key)
+    except Exception as e:
+        logger.warning("Error initializing Gemini Client: %s", e)
+    return _client
 
 
 # ----------------------------------------------------------------------
 # Core Analysis Function
 # ----------------------------------------------------------------------
 
-def analyze_inventory(products_data):
+def analyze_inventory(inventory_summary):
     """
     Analyze inventory data using Gemini and return a structured JSON report.
 
     Args:
-        products_data (list): List of dicts with fields like
-                              [{'id':1, 'name':'Laptop', 'quantity':5, 'price':1000,
-                                'min_stock':10, 'category':'Electronics'}, ...]
+        inventory_summary (dict): Aggregates rather than raw rows, e.g. from
+                                  `inventory.reports.build_report_input`:
+                                  {'total_products': 120, 'low_stock_items': 7,
+                                   'total_value': 52300.0,
+                                   'categories': {'Electronics': {'count': 40, 'low': 3, 'value': 31000.0}},
+                                   'sample_products': [...most urgent products...]}
 
     Returns:
         dict: Structured analysis JSON.
     """
+    client = get_client()
     if not client:
         return {"error": "Gemini Client failed to initialize. Check API Key."}
+    from google.genai import types
 
-    # --- Aggregate & Prepare Data ---
-    low_stock = len([p for p in products_data if p['quantity'] <= p['min_stock']])
-    total_value = sum(p['quantity'] * p['price'] for p in products_data)
-    categories = {}
-
-    for p in products_data:
-        cat = p.get('category', 'Uncategorized')
-        if cat not in categories:
-            categories[cat] = {'count': 0, 'value': 0}
-        categories[cat]['count'] += 1
-        categories[cat]['value'] += p['quantity'] * p['price']
-
-    sample_products = products_data[:5]  # concise preview
+    categories = inventory_summary['categories']
+    sample_products = inventory_summary['sample_products']
 
     # --- Define Schema ---
     inventory_schema = types.Schema(
@@ -118,11 +130,11 @@ def analyze_inventory(products_data):
     You are an AI inventory analyst.
     Analyze this dataset and return a concise, structured report.
 
-    - Total products: {len(products_data)}
-    - Low stock items: {low_stock}
-    - Total value: ₹{total_value:,.2f}
-    - Categories summary: {json.dumps(categories, indent=2)}
-    - Sample products: {json.dumps(sample_products, indent=2)}
+    - Total products: {inventory_summary['total_products']}
+    - Low stock items: {inventory_summary['low_stock_items']}
+    - Total value: ₹{inventory_summary['total_value']:,.2f}
+    - Categories summary (count, low-stock count, value): {json.dumps(categories, indent=2)}
+    - Most urgent products (furthest below minimum stock first): {json.dumps(sample_products, indent=2)}
 
     Generate:
     1. A short summary of overall inventory health.
@@ -142,23 +154,33 @@ def analyze_inventory(products_data):
 
     # --- Call Gemini API ---
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[prompt_text],
-            config=config,
-        )
+        with timed('ext'):
+            response = client.models.generate_content(
+                model="gemini-2.5-flash",
+                contents=[prompt_text],
+                config=config,
+            )
     except Exception as e:
-        print(f"⚠️ Gemini API call failed: {e}")
+        logger.exception("Gemini API call failed")
         return {"error": f"Gemini API call failed: {e}"}
 
     # --- Parse and Return JSON ---
     try:
         return json.loads(response.text)
     except json.JSONDecodeError:
-        print("⚠️ Failed to decode Gemini response as JSON. Returning raw text.")
+        logger.warning("Failed to decode Gemini response as JSON. Returning raw text.")
         return {"raw_response_error": response.text}
 
 
+class GeminiAnalyser(AnalyserBackend):
+    """
+    Report backend that asks Gemini for the analysis.
+    """
+
+    def analyze(self, inventory_summary):
+        return analyze_inventory(inventory_summary)
+
+
 # ----------------------------------------------------------------------
 # Example Usage (for standalone testing)
 # ----------------------------------------------------------------------
@@ -169,5 +191,5 @@ if __name__ == "__main__":
         {"id": 2, "name": "Mouse", "quantity": 50, "price": 20, "min_stock": 100, "category": "Accessories"},
         {"id": 3, "name": "Keyboard", "quantity": 10, "price": 40, "min_stock": 20, "category": "Accessories"},
     ]
-    report = analyze_inventory(mock_products)
+    report = analyze_inventory(summarize_products(mock_products))
     print(json.dumps(report, indent=2))
@@ -0,0 +1,58 @@
+# inventory/management/commands/benchmark_api.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ...benchmarks import BUDGET_FILE, budgets_from_report, load_budgets, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API endpoint against the checked-in query and latency budgets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Requests per endpoint; the median time is compared (default: 5)'
+        )
+        parser.add_argument(
+            '--scale', type=int,
+            help='Override the dataset scale from the budget file (times then are not comparable)'
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument(
+            '--update-budgets', action='store_true',
+            help=f'Rewrite {BUDGET_FILE.name} from this run instead of checking it'
+        )
+
+    def handle(self, *args, **options):
+        # Run on a throwaway test database so real data is never replaced
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = run_benchmarks(load_budgets(), repeat=options['repeat'], scale=options['scale'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['update_budgets']:
+            with open(BUDGET_FILE, 'w') as handle:
+                json.dump(budgets_from_report(report), handle, indent=2)
+                handle.write('\n')
+            self.stdout.write(self.style.SUCCESS(f'Updated {BUDGET_FILE}'))
+            return
+
+        rendered = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(rendered)
+        else:
+            self.stdout.write(rendered)
+
+        failures = [result for result in report['results'] if result['violations']]
+        for result in failures:
+            self.stderr.write(f"{result['name']}: {'; '.join(result['violations'])}")
+        if failures:
+            raise CommandError(f'{len(failures)} of {len(report["results"])} endpoints over budget')
+        self.stderr.write(self.style.SUCCESS(f'All {len(report["results"])} endpoints within budget'))
@@ -0,0 +1,28 @@
+# inventory/management/commands/compact_stock_ledger.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...stock import compact_ledger
+
+
+class Command(BaseCommand):
+    help = 'Fold old stock movements into per-product snapshots so the ledger stays bounded'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than', type=int, default=90,
+            help='Compact movements older than this many days (default: 90)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Products compacted per transaction (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than'])
+        snapshots, movements = compact_ledger(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {movements} movements into {snapshots} snapshots as of {cutoff:%Y-%m-%d %H:%M}'
+        ))
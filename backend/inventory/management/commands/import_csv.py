@@ -0,0 +1,31 @@
+# inventory/management/commands/import_csv.py
+from django.core.management.base import BaseCommand, CommandError
+
+from ...imports import IMPORTERS, import_csv
+
+
+class Command(BaseCommand):
+    help = 'Upsert products (by SKU) or customers (by email) from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='CSV file with a header row')
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Rows validated and upserted per statement (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                report = import_csv(options['resource'], stream, chunk_size=options['chunk_size'])
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        for error in report['errors']:
+            details = '; '.join(f'{field}: {message}' for field, message in error['errors'].items())
+            self.stderr.write(f"Row {error['row']}: {details}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']}, updated {report['updated']}, "
+            f"rejected {len(report['errors'])} {options['resource']}"
+        ))
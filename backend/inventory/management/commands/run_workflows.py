@@ -0,0 +1,56 @@
+# inventory/management/commands/run_workflows.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from ...workflows import run_workflows, scheduler_lock
+
+LOCK_BUSY = 'Scheduler lock not acquired (another run_workflows is running, or the cache is unreachable)'
+
+
+class Command(BaseCommand):
+    help = 'Evaluate all active workflow rules against the catalog, creating alerts and draft purchase orders'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Consider every product, not only those changed since the previous sweep'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Matching products read per query (default: WORKFLOW_SWEEP_CHUNK_SIZE)'
+        )
+        parser.add_argument(
+            '--loop', type=int, default=0, metavar='SECONDS',
+            help='Keep running, sweeping every SECONDS (default: run once)'
+        )
+
+    def handle(self, *args, **options):
+        if options['loop'] < 0:
+            raise CommandError('--loop must be a positive number of seconds')
+        if not options['loop']:
+            if not self.sweep(options):
+                raise CommandError(LOCK_BUSY)
+            return
+
+        while True:
+            close_old_connections()
+            if not self.sweep(options):
+                self.stderr.write(f'{LOCK_BUSY}; skipping this sweep')
+            time.sleep(options['loop'])
+
+    def sweep(self, options):
+        with scheduler_lock() as acquired:
+            if not acquired:
+                return False
+            results = run_workflows(full=options['full'], chunk_size=options['chunk_size'])
+
+        for result in results:
+            created = ', '.join(
+                f'{result[key]} {key.replace("_", " ")}'
+                for key in ('alerts', 'purchase_orders', 'without_vendor') if key in result
+            )
+            self.stdout.write(f"{result['rule']} ({result['action']}): {result['matched']} matched, {created} in {result['ms']}ms")
+        self.stdout.write(self.style.SUCCESS(f'Swept {len(results)} active workflow rules'))
+        return True
@@ -1,169 +1,292 @@
-# inventory/management/commands/seed_data.py (updated line for bill_number)
-from django.core.management.base import BaseCommand
+# inventory/management/commands/seed.py
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.db import connection, transaction
 from faker import Faker
 from faker.providers import lorem
 from decimal import Decimal
 import random
+import re
 from datetime import timedelta
+from ...cache import bump_model_version
+from ...stock import COMMITTED_STATUSES
 from ...models import (
     Category, Product, Customer, Order, OrderItem,
-    Bill, PurchaseOrder, WorkflowRule, Alert
+    Bill, PurchaseOrder, WorkflowRule, Alert, StockMovement, StockSnapshot
 )
 from django.utils import timezone
 
-fake = Faker('en_IN')
-fake.add_provider(lorem)
+CATEGORY_NAMES = ['Electronics', 'Office Supplies', 'Furniture', 'Books', 'Clothing']
+
+# Rows per model at --scale 1; everything else grows linearly
+BASE_COUNTS = {'products': 50, 'customers': 20, 'orders': 30, 'bills': 10, 'purchase_orders': 15}
+
+# Faker is slow per call, so draw text from fixed pools built once per run
+POOL_SIZE = 1000
 
 
 class Command(BaseCommand):
-    help = 'Seed dummy data for inventory app'
+    help = 'Seed a deterministic dataset for the inventory app (use --scale for benchmark-sized data)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=int, default=1,
+            help='Multiply the base row counts (50 products, 20 customers, 30 orders, ...) by N (default: 1)'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Random seed; the same seed and scale always produce the same data (default: 42)'
+        )
+        parser.add_argument(
+            '--no-wipe', action='store_true',
+            help='Append to the existing data instead of deleting it first'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows per bulk INSERT (default: 5000)'
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
-        # Clear existing data (reverse dependencies first)
-        Alert.objects.all().delete()
-        WorkflowRule.objects.all().delete()
-        OrderItem.objects.all().delete()
-        Order.objects.all().delete()
-        PurchaseOrder.objects.all().delete()
-        Bill.objects.all().delete()
-        Product.objects.all().delete()
-        Category.objects.all().delete()
-        Customer.objects.all().delete()
-
-        # Create admin user if not exists
-        if not User.objects.filter(username='admin').exists():
-            User.objects.create_superuser('admin', 'admin@example.com', 'password')
-
-        # Seed categories
-        categories = []
-        category_names = ['Electronics', 'Office Supplies', 'Furniture', 'Books', 'Clothing']
-        for name in category_names:
-            cat = Category.objects.create(
+        if options['scale'] < 1:
+            raise CommandError('--scale must be at least 1')
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('en_IN')
+        self.fake.add_provider(lorem)
+        self.fake.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        counts = {name: count * options['scale'] for name, count in BASE_COUNTS.items()}
+
+        with transaction.atomic():
+            if not options['no_wipe']:
+                self.wipe()
+
+            # Create admin user if not exists
+            if not User.objects.filter(username='admin').exists():
+                User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+            self.build_pools()
+            categories = self.seed_categories()
+            products = self.seed_products(counts['products'], categories)
+            customers, vendors = self.seed_customers(counts['customers'])
+            items = self.seed_orders(counts['orders'], products, customers, vendors)
+            self.seed_bills(counts['bills'], vendors)
+            self.seed_purchase_orders(counts['purchase_orders'], vendors)
+            self.seed_workflows()
+
+        # bulk_create sends no post_save, so invalidate cached responses explicitly
+        for model in (Category, Product, Customer, Order, OrderItem, WorkflowRule):
+            bump_model_version(model)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully seeded {len(products)} products, {len(customers) + len(vendors)} customers, "
+            f"{counts['orders']} orders ({items} items), {counts['bills']} bills "
+            f"and {counts['purchase_orders']} purchase orders!"
+        ))
+
+    def wipe(self):
+        # Reverse dependencies first. Plain DELETEs skip the per-row collector,
+        # which would otherwise load every row to send delete signals.
+        with connection.cursor() as cursor:
+            for model in (
+                Alert, WorkflowRule, StockSnapshot, StockMovement, OrderItem, Order,
+                PurchaseOrder, Bill, Product, Category, Customer
+            ):
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+
+    def build_pools(self):
+        fake = self.fake
+        self.words = [fake.word().capitalize() for _ in range(POOL_SIZE)]
+        self.names = [fake.name() for _ in range(POOL_SIZE)]
+        self.companies = [fake.company() for _ in range(POOL_SIZE)]
+        self.addresses = [fake.address() for _ in range(POOL_SIZE)]
+        self.phones = [fake.phone_number() for _ in range(POOL_SIZE)]
+        self.paragraphs = [fake.paragraph(nb_sentences=3) for _ in range(POOL_SIZE // 10)]
+
+    def last_pk(self, model):
+        return model.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+    def offset(self, model, field, pattern):
+        """
+        Highest number `pattern` captures from `field`, so --no-wipe runs continue
+        past every existing counter-based key (row count falls behind after deletes).
+        """
+        regex = re.compile(pattern)
+        matches = (regex.fullmatch(value) for value in model.objects.values_list(field, flat=True).iterator())
+        return max((int(match.group(1)) for match in matches if match), default=0)
+
+    def seed_categories(self):
+        existing = set(Category.objects.filter(name__in=CATEGORY_NAMES).values_list('name', flat=True))
+        Category.objects.bulk_create([
+            Category(name=name, description=self.fake.paragraph(nb_sentences=2))
+            for name in CATEGORY_NAMES if name not in existing
+        ])
+        return list(Category.objects.filter(name__in=CATEGORY_NAMES).values_list('id', flat=True))
+
+    def seed_products(self, count, categories):
+        rng = self.rng
+        start = self.offset(Product, 'sku', r'SKU-(\d+)') + 1
+        last_pk = self.last_pk(Product)
+        rows = []
+        for n in range(start, start + count):
+            rows.append(Product(
+                name=f'{rng.choice(self.words)} {rng.choice(self.words)}',
+                sku=f'SKU-{n:08d}',
+                barcode=f'{8900000000000 + n:013d}',
+                category_id=rng.choice(categories),
+                quantity=rng.randint(0, 200),
+                price=Decimal(f'{rng.uniform(10.0, 500.0):.2f}'),
+                min_stock=rng.randint(5, 50),
+                description=rng.choice(self.paragraphs),
+                is_active=rng.random() < 0.5,
+            ))
+        Product.objects.bulk_create(rows, batch_size=self.batch_size)
+
+        products = list(
+            Product.objects.filter(pk__gt=last_pk).order_by('pk').values_list('id', 'price', 'quantity')
+        )
+        now = timezone.now()
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(product_id=pk, delta=quantity, reason='adjustment', note='Opening stock', created_at=now)
+                for pk, _, quantity in products if quantity
+            ],
+            batch_size=self.batch_size
+        )
+        return [(pk, price) for pk, price, _ in products]
+
+    def seed_customers(self, count):
+        rng = self.rng
+        start = self.offset(Customer, 'email', r'.*\.(\d+)@example\.com') + 1
+        last_pk = self.last_pk(Customer)
+        rows = []
+        for n in range(start, start + count):
+            name = rng.choice(self.names)
+            handle = ''.join(ch for ch in name.split()[-1].lower() if ch.isalpha()) or 'customer'
+            rows.append(Customer(
                 name=name,
-                description=fake.paragraph(nb_sentences=2)
-            )
-            categories.append(cat)
-
-        # Seed products
-        products = []
-        for _ in range(50):
-            product = Product.objects.create(
-                name=fake.word().capitalize() + ' ' + fake.word().capitalize(),
-                sku=fake.uuid4()[:8].upper(),
-                barcode=fake.ean13(),
-                category=random.choice(categories),
-                quantity=random.randint(0, 200),
-                price=Decimal(str(random.uniform(10.0, 500.0))),
-                min_stock=random.randint(5, 50),
-                description=fake.paragraph(nb_sentences=3),
-                is_active=random.choice([True, False])
-            )
-            products.append(product)
-
-        # Seed customers
-        customers = []
-        for _ in range(20):
-            customer_type = random.choice(['customer', 'vendor'])
-            customer = Customer.objects.create(
-                name=fake.name(),
-                email=fake.email(),
-                phone=fake.phone_number(),
-                company=fake.company(),
-                address=fake.address(),
-                type=customer_type,
-                is_active=True
-            )
-            customers.append(customer)
-
-        # Seed orders with unique IDs using counter
-        order_num = 1
-        for _ in range(30):
-            order_type = random.choice(['sales', 'purchase'])
-            customer = random.choice([c for c in customers if (order_type == 'sales' and c.type == 'customer') or (order_type == 'purchase' and c.type == 'vendor')])
-            order = Order.objects.create(
-                id=f'ORD-{order_num:03d}',
+                email=f'{handle}.{n}@example.com',
+                phone=rng.choice(self.phones),
+                company=rng.choice(self.companies),
+                address=rng.choice(self.addresses),
+                # Alternate the first two so both order types always have a counterparty
+                type=('customer', 'vendor')[n - start] if n - start < 2 else rng.choice(['customer', 'vendor']),
+                is_active=True,
+            ))
+        Customer.objects.bulk_create(rows, batch_size=self.batch_size)
+
+        customers, vendors = [], []
+        for pk, kind in Customer.objects.filter(pk__gt=last_pk).order_by('pk').values_list('id', 'type').iterator():
+            (vendors if kind == 'vendor' else customers).append(pk)
+        return customers, vendors
+
+    def seed_orders(self, count, products, customers, vendors):
+        rng = self.rng
+        start = self.offset(Order, 'pk', r'ORD-(\d+)') + 1
+        statuses = ['pending', 'confirmed', 'shipped', 'delivered', 'cancelled']
+        now = timezone.now()
+        orders, items, item_count = [], [], 0
+        for n in range(start, start + count):
+            order_type = rng.choice(['sales', 'purchase'])
+            customer_id = rng.choice(customers if order_type == 'sales' else vendors)
+            status = rng.choice(statuses)
+            # Spread over the past year so date ordering, filters and forecasts see real history
+            created_at = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86399))
+            order = Order(
+                id=f'ORD-{n:07d}',
                 type=order_type,
-                customer=customer,
-                status=random.choice(['pending', 'confirmed', 'shipped', 'delivered', 'cancelled']),
-                total=Decimal('0.00')
+                customer_id=customer_id,
+                status=status,
+                created_at=created_at,
+                # Seeded stock levels already reflect these orders, so later
+                # edits must not move their stock again
+                stock_committed_at=created_at if status in COMMITTED_STATUSES[order_type] else None,
             )
-            order_num += 1
-            # Add items
-            num_items = random.randint(1, 5)
             total = Decimal('0.00')
-            for _ in range(num_items):
-                product = random.choice(products)
-                quantity = random.randint(1, 10)
-                price = product.price  # Use current price
-                item = OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    quantity=quantity,
-                    price=price
-                )
-                total += item.subtotal
+            for _ in range(rng.randint(1, 5)):
+                product_id, price = rng.choice(products)
+                quantity = rng.randint(1, 10)
+                items.append(OrderItem(order_id=order.id, product_id=product_id, quantity=quantity, price=price))
+                total += quantity * price
             order.total = total
-            order.save()
-
-        # Seed bills with unique IDs using counter
-        bill_num = 1
-        for _ in range(10):
-            vendor = random.choice([c for c in customers if c.type == 'vendor'])
-            Bill.objects.create(
-                id=f'BILL-{bill_num:03d}',
-                vendor=vendor,
-                bill_number=f'INV-{fake.date_object().strftime("%Y")}-{random.randint(1, 999):03d}',
-                date=fake.date_this_year(),
-                due_date=fake.date_between(start_date='-30d', end_date='+30d'),
-                status=random.choice(['unpaid', 'paid', 'overdue']),
-                amount=Decimal(str(random.uniform(1000.0, 10000.0)))
-            )
-            bill_num += 1
-
-        # Seed purchase orders with unique IDs using counter
-        po_num = 1
-        for _ in range(15):
-            vendor = random.choice([c for c in customers if c.type == 'vendor'])
-            PurchaseOrder.objects.create(
-                id=f'PO-{po_num:03d}',
-                vendor=vendor,
-                date=fake.date_this_year(),
-                status=random.choice(['pending', 'approved', 'received']),
-                total=Decimal(str(random.uniform(500.0, 5000.0))),
-                items_count=random.randint(1, 10)
-            )
-            po_num += 1
-
-        # Seed workflows
-        WorkflowRule.objects.create(
-            id='WF-001',
-            name='Low Stock Alert',
-            description='Send email when inventory falls below minimum level',
-            trigger_condition='Inventory Level < 10',
-            action='Send Email Alert',
-            status='active',
-            last_triggered=timezone.now() - timedelta(hours=2)
-        )
-        WorkflowRule.objects.create(
-            id='WF-002',
-            name='Auto Reorder',
-            description='Automatically create purchase orders for low stock items',
-            trigger_condition='Stock Level < Reorder Point',
-            action='Create Purchase Order',
-            status='active',
-            last_triggered=timezone.now() - timedelta(days=1)
+            orders.append(order)
+
+            if len(orders) >= self.batch_size:
+                item_count += self.flush_orders(orders, items)
+                orders, items = [], []
+        return item_count + self.flush_orders(orders, items)
+
+    def flush_orders(self, orders, items):
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create(items, batch_size=self.batch_size)
+        return len(items)
+
+    def seed_bills(self, count, vendors):
+        rng = self.rng
+        start = self.offset(Bill, 'pk', r'BILL-(\d+)') + 1
+        today = timezone.now().date()
+        Bill.objects.bulk_create(
+            [
+                Bill(
+                    id=f'BILL-{n:07d}',
+                    vendor_id=rng.choice(vendors),
+                    bill_number=f'INV-{today.year}-{n:07d}',
+                    date=today - timedelta(days=rng.randint(0, 365)),
+                    due_date=today + timedelta(days=rng.randint(-30, 30)),
+                    status=rng.choice(['unpaid', 'paid', 'overdue']),
+                    amount=Decimal(f'{rng.uniform(1000.0, 10000.0):.2f}'),
+                )
+                for n in range(start, start + count)
+            ],
+            batch_size=self.batch_size
         )
 
-        # Seed alerts
-        Alert.objects.create(
-            id='ALT-001',
-            title='Critical Stock Level',
-            description='Laptop Pro inventory below critical threshold',
-            type='critical',
-            status='unread'
+    def seed_purchase_orders(self, count, vendors):
+        rng = self.rng
+        start = self.offset(PurchaseOrder, 'pk', r'PO-(\d+)') + 1
+        today = timezone.now().date()
+        PurchaseOrder.objects.bulk_create(
+            [
+                PurchaseOrder(
+                    id=f'PO-{n:07d}',
+                    vendor_id=rng.choice(vendors),
+                    date=today - timedelta(days=rng.randint(0, 365)),
+                    status=rng.choice(['pending', 'approved', 'received']),
+                    total=Decimal(f'{rng.uniform(500.0, 5000.0):.2f}'),
+                    items_count=rng.randint(1, 10),
+                )
+                for n in range(start, start + count)
+            ],
+            batch_size=self.batch_size
         )
 
-        self.stdout.write(self.style.SUCCESS('Successfully seeded data!'))
\ No newline at end of file
+    def seed_workflows(self):
+        now = timezone.now()
+        WorkflowRule.objects.bulk_create([
+            WorkflowRule(
+                id='WF-001',
+                name='Low Stock Alert',
+                description='Send email when inventory falls below minimum level',
+                trigger_condition='Inventory Level < 10',
+                action='Send Email Alert',
+                status='active',
+                last_triggered=now - timedelta(hours=2)
+            ),
+            WorkflowRule(
+                id='WF-002',
+                name='Auto Reorder',
+                description='Automatically create purchase orders for low stock items',
+                trigger_condition='Stock Level < Reorder Point',
+                action='Create Purchase Order',
+                status='active',
+                last_triggered=now - timedelta(days=1)
+            ),
+        ], ignore_conflicts=True)
+        Alert.objects.bulk_create([
+            Alert(
+                id='ALT-001',
+                title='Critical Stock Level',
+                description='Laptop Pro inventory below critical threshold',
+                type='critical',
+                status='unread'
+            ),
+        ], ignore_conflicts=True)
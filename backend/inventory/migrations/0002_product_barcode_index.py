@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='barcode',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from inventory.search import install_search_indexes
+    install_search_indexes(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    from inventory.search import uninstall_search_indexes
+    uninstall_search_indexes(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
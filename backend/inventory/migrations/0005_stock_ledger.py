@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:15
+
+import itertools
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def snapshot_existing_stock(apps, schema_editor):
+    # Opening balances, so as-of queries work for stock that predates the ledger
+    Product = apps.get_model('inventory', 'Product')
+    StockSnapshot = apps.get_model('inventory', 'StockSnapshot')
+    now = django.utils.timezone.now()
+    snapshots = (
+        StockSnapshot(product_id=pk, quantity=quantity, taken_at=now)
+        for pk, quantity in Product.objects.values_list('id', 'quantity').iterator(chunk_size=2000)
+    )
+    while True:
+        batch = list(itertools.islice(snapshots, 2000))
+        if not batch:
+            break
+        StockSnapshot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('adjustment', 'Manual Adjustment'), ('sale', 'Sale'), ('receipt', 'Purchase Receipt'), ('reversal', 'Reversal')], default='adjustment', max_length=20)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='inventory.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='inventory.product')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['product', 'created_at'], name='movement_product_created_idx'), models.Index(fields=['created_at'], name='movement_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='inventory.product')),
+            ],
+            options={
+                'ordering': ['-taken_at'],
+                'constraints': [models.UniqueConstraint(fields=('product', 'taken_at'), name='unique_product_snapshot')],
+            },
+        ),
+        migrations.RunPython(snapshot_existing_stock, migrations.RunPython.noop),
+    ]
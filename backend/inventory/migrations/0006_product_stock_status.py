@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:17
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_status',
+            field=models.GeneratedField(db_index=True, db_persist=True, expression=models.Case(models.When(quantity__lte=models.F('min_stock'), then=models.Value('low')), models.When(quantity__lte=django.db.models.expressions.CombinedExpression(models.F('min_stock'), '*', models.Value(2)), then=models.Value('medium')), default=models.Value('good')), output_field=models.CharField(max_length=10)),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_product_stock_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowrule',
+            name='last_swept',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:12
+
+from django.db import migrations, models
+from django.db.models import F, Max, Q, Sum
+
+# Frozen copy of inventory.stock.COMMITTED_STATUSES
+COMMITTED_STATUSES = {
+    'sales': ['confirmed', 'shipped', 'delivered'],
+    'purchase': ['delivered'],
+}
+
+
+def mark_committed_orders(apps, schema_editor):
+    # Orders whose ledger movements still net to a non-zero delta have moved stock
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+    Order = apps.get_model('inventory', 'Order')
+    committed = {}
+    rows = (
+        StockMovement.objects.filter(order__isnull=False).order_by()
+        .values_list('order', 'product').annotate(total=Sum('delta'), last=Max('created_at'))
+    )
+    for order_id, _, total, last in rows.iterator(chunk_size=2000):
+        if total:
+            committed[order_id] = max(last, committed.get(order_id, last))
+    for order_id, committed_at in committed.items():
+        Order.objects.filter(pk=order_id).update(stock_committed_at=committed_at)
+
+    # Orders already confirmed or received before the ledger existed moved
+    # stock that was never recorded; mark them so later edits don't move it again
+    in_committed_status = Q()
+    for order_type, statuses in COMMITTED_STATUSES.items():
+        in_committed_status |= Q(type=order_type, status__in=statuses)
+    Order.objects.filter(in_committed_status, stock_committed_at__isnull=True).update(
+        stock_committed_at=F('updated_at')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_workflowrule_last_swept'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='stock_committed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_committed_orders, migrations.RunPython.noop),
+    ]
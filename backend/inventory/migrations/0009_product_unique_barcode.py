@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:17
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def prepare_unique_barcodes(apps, schema_editor):
+    Product = apps.get_model('inventory', 'Product')
+    # Blank barcodes are "no barcode"; NULLs are exempt from the constraint
+    Product.objects.filter(barcode='').update(barcode=None)
+
+    # Which product keeps a shared barcode is a business decision, so
+    # refuse to guess and list the conflicts for someone to resolve
+    shared = list(
+        Product.objects.filter(barcode__isnull=False).order_by().values('barcode')
+        .annotate(count=Count('id')).filter(count__gt=1).values_list('barcode', flat=True)
+    )
+    if shared:
+        conflicts = Product.objects.filter(barcode__in=shared).order_by('barcode', 'id')
+        lines = [f"  {barcode}: id={pk} sku={sku}" for barcode, pk, sku in conflicts.values_list('barcode', 'id', 'sku')]
+        raise RuntimeError(
+            "Cannot make product barcodes unique; these products share a barcode. "
+            "Clear or correct the duplicates, then migrate again:\n" + "\n".join(lines)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_order_stock_committed_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(prepare_unique_barcodes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(condition=models.Q(('barcode__isnull', False)), fields=('barcode',), name='unique_product_barcode'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_product_unique_barcode'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='barcode',
+            field=models.CharField(blank=True, max_length=50, null=True),
+        ),
+    ]
@@ -1,5 +1,5 @@
 # inventory/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
@@ -20,10 +20,38 @@ class Category(models.Model):
         return self.name
 
 
+# Stock value of a product row, computed by the database
+STOCK_VALUE = models.ExpressionWrapper(
+    models.F('quantity') * models.F('price'),
+    # Wide enough for the largest quantity times the largest price
+    output_field=models.DecimalField(max_digits=20, decimal_places=2)
+)
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_stock_value(self):
+        """
+        Annotate each row with `stock_value` (quantity * price) in SQL.
+        """
+        return self.annotate(stock_value=STOCK_VALUE)
+
+    def stock_value_total(self):
+        """
+        Total inventory value of the queryset as a single aggregate.
+        """
+        return self.aggregate(total=models.Sum(STOCK_VALUE))['total'] or 0
+
+
 class Product(models.Model):
     """
     Core inventory product model with stock tracking.
     """
+    STOCK_STATUS_CHOICES = [
+        ('low', 'Low'),
+        ('medium', 'Medium'),
+        ('good', 'Good'),
+    ]
+
     name = models.CharField(max_length=200)
     sku = models.CharField(max_length=50, unique=True)
     barcode = models.CharField(max_length=50, blank=True, null=True)
@@ -35,29 +63,71 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # 'low', 'medium' or 'good'; computed by the database on every write,
+    # including bulk F() updates, so it can be indexed and filtered on.
+    stock_status = models.GeneratedField(
+        expression=models.Case(
+            models.When(quantity__lte=models.F('min_stock'), then=models.Value('low')),
+            models.When(quantity__lte=models.F('min_stock') * 2, then=models.Value('medium')),
+            default=models.Value('good'),
+        ),
+        output_field=models.CharField(max_length=10),
+        db_persist=True,
+        db_index=True,
+    )
+
+    objects = ProductQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+        ]
+        constraints = [
+            # Scanner lookups and adjustments resolve a barcode to one product;
+            # products without one store NULL
+            models.UniqueConstraint(
+                fields=['barcode'], condition=models.Q(barcode__isnull=False), name='unique_product_barcode'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
-    @property
-    def stock_status(self):
+    def save(self, *args, **kwargs):
         """
-        Returns stock status: 'low', 'medium', 'good'.
+        Save the product and record any quantity change in the stock ledger,
+        so edits from the admin, the API or plain ORM code all keep it in step.
+
+        Bulk writes (queryset updates, bulk_create) bypass this and record
+        their own movements.
         """
-        if self.quantity <= self.min_stock:
-            return 'low'
-        elif self.quantity <= self.min_stock * 2:
-            return 'medium'
-        return 'good'
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'quantity' not in update_fields:
+            return super().save(*args, **kwargs)
+        adding = self._state.adding
+        with transaction.atomic():
+            previous = 0
+            if not adding:
+                # Compare with the stored row, not a possibly stale instance
+                previous = Product.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'quantity', flat=True
+                ).first() or 0
+            super().save(*args, **kwargs)
+            if self.quantity != previous:
+                StockMovement.objects.create(
+                    product=self, delta=self.quantity - previous,
+                    note='Opening stock' if adding else 'Quantity edited',
+                )
 
     @property
     def total_value(self):
         """
         Current total value of this product in stock.
+        Prefers the `stock_value` annotation when the queryset provides one.
         """
+        if 'stock_value' in self.__dict__:
+            return self.stock_value
         return self.quantity * self.price
 
 
@@ -82,6 +152,9 @@ class Customer(models.Model):
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['name', 'id'], name='customer_name_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_type_display()})"
@@ -108,11 +181,18 @@ class Order(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.PROTECT, related_name='orders')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     total = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    # When the items last moved stock (None while they haven't, or after a
+    # reversal). Kept on the order because ledger compaction prunes movements.
+    stock_committed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='order_created_id_idx'),
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_type_display()} Order {self.id}"
@@ -138,6 +218,57 @@ class OrderItem(models.Model):
         return self.quantity * self.price
 
 
+class StockMovement(models.Model):
+    """
+    Append-only ledger of product quantity changes.
+    """
+    REASON_CHOICES = [
+        ('adjustment', 'Manual Adjustment'),
+        ('sale', 'Sale'),
+        ('receipt', 'Purchase Receipt'),
+        ('reversal', 'Reversal'),
+    ]
+
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, default='adjustment')
+    order = models.ForeignKey(
+        Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements'
+    )
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='movement_product_created_idx'),
+            models.Index(fields=['created_at'], name='movement_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.delta:+d} ({self.reason})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Compacted stock balance of a product at a point in time.
+    Balance as of T = latest snapshot at or before T + movements after it up to T.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_snapshots')
+    quantity = models.IntegerField()
+    taken_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-taken_at']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'taken_at'], name='unique_product_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} = {self.quantity} @ {self.taken_at}"
+
+
 class Bill(models.Model):
     """
     Vendor bills for tracking payments.
@@ -211,6 +342,8 @@ class WorkflowRule(models.Model):
     action = models.CharField(max_length=200)  # e.g., "send_email"
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='inactive')
     last_triggered = models.DateTimeField(null=True, blank=True)
+    # Start of the last run_workflows sweep; later sweeps only revisit products changed since
+    last_swept = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
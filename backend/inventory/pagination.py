@@ -0,0 +1,51 @@
+# inventory/pagination.py
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+
+class InventoryCursorPagination(CursorPagination):
+    """
+    Keyset pagination: every page costs one indexed range scan, no COUNT/OFFSET.
+
+    The ordering comes from the view's `cursor_ordering`, falling back to the
+    model ordering plus the primary key as a tie-breaker.
+    """
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering is None:
+            ordering = [*queryset.model._meta.ordering, 'pk']
+        return tuple(ordering)
+
+
+class InventoryPagination(BasePagination):
+    """
+    Page-number pagination by default; `?paginator=cursor` switches the
+    request to keyset pagination.
+    """
+    paginator_query_param = 'paginator'
+
+    def __init__(self):
+        self.delegate = PageNumberPagination()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.paginator_query_param) == 'cursor':
+            self.delegate = InventoryCursorPagination()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    def get_results(self, data):
+        return self.delegate.get_results(data)
+
+    def get_schema_operation_parameters(self, view):
+        return self.delegate.get_schema_operation_parameters(view)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.delegate, 'display_page_controls', False)
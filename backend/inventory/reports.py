@@ -0,0 +1,398 @@
+# inventory/reports.py
+import contextvars
+import hashlib
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from .analysers import analyze_inventory
+from .models import Product, STOCK_VALUE
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = Lock()
+
+RISK_LEVELS = ['low', 'medium', 'high']
+
+# Tokens reserved in each chunk prompt for instructions, schema and totals
+PROMPT_OVERHEAD_TOKENS = 1000
+
+MAX_MERGED_RECOMMENDATIONS = 10
+
+
+def inventory_aggregates():
+    """
+    Per-category product count, low-stock count, stock value and last update,
+    from a single grouped query.
+    """
+    return list(
+        Product.objects.values('category', 'category__name')
+        .annotate(
+            count=Count('id'),
+            low=Count('id', filter=Q(stock_status='low')),
+            value=Sum(STOCK_VALUE),
+            last_updated=Max('updated_at'),
+        )
+        .order_by('category__name')
+    )
+
+
+def report_fingerprint(aggregates=None):
+    """
+    Hash of the aggregates the AI inventory report is derived from.
+
+    Covers product count, low-stock count, per-category count/value and the
+    latest `updated_at`, so any add, delete, restock or re-price changes it.
+    """
+    if aggregates is None:
+        aggregates = inventory_aggregates()
+    payload = json.dumps(aggregates, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def report_cache_key(fingerprint):
+    return f"inventory:ai-report:{fingerprint}"
+
+
+def ranked_sample(limit, category=...):
+    """
+    The `limit` products most relevant to a reorder analysis: furthest below
+    their minimum stock first, then by tied-up stock value.
+
+    `category` (an id, or None for uncategorised) restricts the sample to
+    one category.
+    """
+    products = Product.objects.filter(is_active=True)
+    if category is not ...:
+        products = products.filter(category=category) if category else products.filter(category__isnull=True)
+    rows = (
+        products
+        .annotate(shortage=F('min_stock') - F('quantity'), stock_value=STOCK_VALUE)
+        .order_by('-shortage', '-stock_value', 'id')
+        .values('id', 'name', 'sku', 'quantity', 'min_stock', 'price', 'stock_status', 'category__name')[:limit]
+    )
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'sku': row['sku'],
+            'category': row['category__name'] or 'Uncategorized',
+            'quantity': row['quantity'],
+            'min_stock': row['min_stock'],
+            'price': float(row['price']),
+            'stock_status': row['stock_status'],
+        }
+        for row in rows
+    ]
+
+
+def build_report_input(aggregates, sample_products=None):
+    """
+    Analyser input: catalog-wide totals, per-category totals and a bounded
+    sample, so its size does not grow with the catalog.
+    """
+    if sample_products is None:
+        sample_products = ranked_sample(settings.INVENTORY_REPORT_SAMPLE_SIZE)
+    categories = {
+        row['category__name'] or 'Uncategorized': {
+            'count': row['count'],
+            'low': row['low'],
+            'value': float(row['value'] or 0),
+        }
+        for row in aggregates
+    }
+    return {
+        'total_products': sum(row['count'] for row in aggregates),
+        'low_stock_items': sum(row['low'] for row in aggregates),
+        'total_value': float(sum(row['value'] or 0 for row in aggregates)),
+        'categories': categories,
+        'sample_products': sample_products,
+    }
+
+
+def estimate_tokens(data):
+    """
+    Rough prompt size of `data` once JSON-encoded (about 4 characters a token).
+    """
+    return len(json.dumps(data, cls=DjangoJSONEncoder)) // 4 + 1
+
+
+def chunk_sample(row):
+    """
+    Ranked sample for one category, trimmed to the per-chunk token budget.
+    """
+    budget = settings.INVENTORY_REPORT_CHUNK_TOKENS - PROMPT_OVERHEAD_TOKENS
+    sample, used = [], 0
+    for product in ranked_sample(settings.INVENTORY_REPORT_CHUNK_SAMPLE_MAX, category=row['category']):
+        used += estimate_tokens(product)
+        if used > budget:
+            break
+        sample.append(product)
+    return sample
+
+
+def chunk_cache_key(row):
+    return f"inventory:ai-report-chunk:{report_fingerprint([row])}"
+
+
+def _risk_rank(level):
+    """
+    Position of a risk or urgency level in RISK_LEVELS; anything the model
+    returned outside the enum counts as 'low'.
+    """
+    return RISK_LEVELS.index(level) if level in RISK_LEVELS else 0
+
+
+def merge_reports(aggregates, partials):
+    """
+    Reduce per-category reports into one report of the InventoryReportSerializer shape.
+
+    Counts and values come from the SQL aggregates rather than the model
+    output, so they stay exact however the partial reports round them.
+
+    Args:
+        aggregates (list): Rows from `inventory_aggregates`.
+        partials (dict): {category name: report} for categories analysed successfully.
+    """
+    total = sum(row['count'] for row in aggregates)
+    low = sum(row['low'] for row in aggregates)
+    value = float(sum(row['value'] or 0 for row in aggregates))
+    counts = {row['category__name'] or 'Uncategorized': row['count'] for row in aggregates}
+
+    # Riskiest categories first, then the largest
+    ranked = sorted(
+        partials.items(),
+        key=lambda item: (-_risk_rank(item[1].get('risk_level')), -counts.get(item[0], 0)),
+    )
+    weighted = sum(_risk_rank(report.get('risk_level')) * counts.get(name, 0) for name, report in ranked)
+    weight = sum(counts.get(name, 0) for name, _ in ranked)
+    risk_level = RISK_LEVELS[round(weighted / weight)] if weight else 'low'
+
+    recommendations = sorted(
+        (item for _, report in ranked for item in report.get('reorder_recommendations', [])),
+        key=lambda item: -_risk_rank(item.get('urgency')),
+    )
+    action_items = []
+    for _, report in ranked:
+        for item in report.get('action_items', []):
+            if item not in action_items:
+                action_items.append(item)
+
+    summary = f"{total} products across {len(aggregates)} categories worth ₹{value:,.2f}; {low} are at or below minimum stock."
+    if ranked:
+        summary += f" Highest risk: {ranked[0][0]} ({ranked[0][1].get('risk_level', 'low')})."
+    return {
+        'summary': summary,
+        'low_stock_items': low,
+        'total_value': value,
+        'reorder_recommendations': recommendations[:MAX_MERGED_RECOMMENDATIONS],
+        'trends': ' '.join(f"{name}: {report['trends']}" for name, report in ranked[:5] if report.get('trends')),
+        'risk_level': risk_level,
+        'action_items': action_items[:5],
+    }
+
+
+def build_chunked_report(aggregates, refresh=False):
+    """
+    Map-reduce analysis for large catalogs: one analyser call per category,
+    run concurrently on a bounded pool, each cached under its own category
+    fingerprint so unchanged categories are not re-analysed.
+    """
+    ttl = settings.INVENTORY_REPORT_CACHE_TTL
+    partials, pending = {}, []
+    for row in aggregates:
+        name = row['category__name'] or 'Uncategorized'
+        cached = cache.get(chunk_cache_key(row)) if ttl and not refresh else None
+        if cached is not None:
+            partials[name] = cached
+        else:
+            # Inputs are read here so worker threads never touch the database
+            pending.append((name, row, build_report_input([row], chunk_sample(row))))
+
+    if pending:
+        with ThreadPoolExecutor(
+            max_workers=min(settings.INVENTORY_REPORT_CHUNK_WORKERS, len(pending)),
+            thread_name_prefix='inventory-report-chunk',
+        ) as pool:
+            # Each call runs in a copy of this context so timed('ext') spans reach the request
+            contexts = [contextvars.copy_context() for _ in pending]
+            results = pool.map(lambda chunk, context: context.run(analyze_inventory, chunk[2]), pending, contexts)
+            for (name, row, _), report in zip(pending, results):
+                if not _cacheable(report):
+                    logger.warning("Inventory report chunk %r failed: %s", name, report)
+                    continue
+                partials[name] = report
+                if ttl:
+                    cache.set(chunk_cache_key(row), report, ttl)
+
+    if not partials:
+        return {"error": "Analysis failed for every category"}
+    return merge_reports(aggregates, partials)
+
+
+def build_inventory_report(aggregates=None, refresh=False):
+    """
+    Run the analyser over the current catalog, per category once it has more
+    than INVENTORY_REPORT_CHUNK_THRESHOLD products.
+
+    Returns:
+        dict | None: The analyser's report (possibly an {"error": ...} dict),
+                     or None when there are no products to analyse.
+    """
+    if aggregates is None:
+        aggregates = inventory_aggregates()
+    if not aggregates:
+        return None
+    if len(aggregates) > 1 and sum(row['count'] for row in aggregates) > settings.INVENTORY_REPORT_CHUNK_THRESHOLD:
+        return build_chunked_report(aggregates, refresh=refresh)
+    return analyze_inventory(build_report_input(aggregates))
+
+
+def get_inventory_report(refresh=False):
+    """
+    Return the AI report for the current catalog, generating it only when the
+    inputs changed since the last cached run (or when `refresh` is set).
+
+    Returns:
+        tuple: (report or None, served_from_cache)
+    """
+    ttl = settings.INVENTORY_REPORT_CACHE_TTL
+    aggregates = inventory_aggregates()
+    cache_key = report_cache_key(report_fingerprint(aggregates)) if ttl else None
+    if cache_key and not refresh:
+        report = cache.get(cache_key)
+        if report is not None:
+            return report, True
+
+    report = build_inventory_report(aggregates, refresh=refresh)
+    # Failed or unparseable analyses are retried on the next request
+    if cache_key and _cacheable(report):
+        cache.set(cache_key, report, ttl)
+    return report, False
+
+
+def _cacheable(report):
+    return bool(report) and not {'error', 'raw_response_error'} & report.keys()
+
+
+def job_key(job_id):
+    return f"inventory:ai-report-job:{job_id}"
+
+
+def _pending_key(fingerprint):
+    return f"inventory:ai-report-pending:{fingerprint}"
+
+
+def _save_job(job):
+    cache.set(job_key(job['id']), job, settings.INVENTORY_REPORT_JOB_TTL)
+
+
+def get_report_job(job_id):
+    """
+    The job record, with queued or running jobs older than
+    INVENTORY_REPORT_JOB_TIMEOUT reported as failed (their worker is gone).
+    """
+    job = cache.get(job_key(job_id))
+    if job is not None and job['status'] in ('queued', 'running'):
+        deadline = datetime.fromisoformat(job['created_at']) + timedelta(seconds=settings.INVENTORY_REPORT_JOB_TIMEOUT)
+        if timezone.now() > deadline:
+            job = {**job, 'status': 'failed', 'error': "Report job timed out"}
+    return job
+
+
+def _run_in_background(func, *args):
+    """
+    Hand `func` to the shared report worker pool (inline when the pool size is 0).
+    """
+    global _executor
+    if not settings.INVENTORY_REPORT_WORKERS:
+        func(*args)
+        return
+
+    def work():
+        try:
+            func(*args)
+        finally:
+            # Worker threads open their own connections; don't leak them
+            connections.close_all()
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.INVENTORY_REPORT_WORKERS, thread_name_prefix='inventory-report'
+            )
+    _executor.submit(work)
+
+
+def _run_report_job(job_id, fingerprint, refresh=False):
+    job = get_report_job(job_id) or {'id': job_id, 'fingerprint': fingerprint}
+    _save_job({**job, 'status': 'running'})
+    try:
+        report = build_inventory_report(refresh=refresh)
+        if report is None:
+            job.update(status='failed', error="No inventory data available")
+        elif not _cacheable(report):
+            job.update(status='failed', error=report.get('error') or "Invalid report structure")
+        else:
+            if settings.INVENTORY_REPORT_CACHE_TTL:
+                cache.set(report_cache_key(fingerprint), report, settings.INVENTORY_REPORT_CACHE_TTL)
+            job.update(status='done', result=report)
+    except Exception as e:
+        logger.exception("Inventory report job %s failed", job_id)
+        job.update(status='failed', error=str(e))
+    finally:
+        job['finished_at'] = timezone.now().isoformat()
+        _save_job(job)
+        cache.delete(_pending_key(fingerprint))
+
+
+def enqueue_report_job(refresh=False):
+    """
+    Start generating the AI report in the background.
+
+    Requests for the same catalog fingerprint share one job, and a report
+    that is already cached yields a job that is done immediately.
+
+    Returns:
+        dict: The job record ({"id", "status", "fingerprint", ...}).
+    """
+    fingerprint = report_fingerprint()
+    job = {
+        'id': uuid.uuid4().hex,
+        'status': 'queued',
+        'fingerprint': fingerprint,
+        'created_at': timezone.now().isoformat(),
+    }
+    if not refresh and settings.INVENTORY_REPORT_CACHE_TTL:
+        report = cache.get(report_cache_key(fingerprint))
+        if report is not None:
+            job.update(status='done', result=report, finished_at=job['created_at'])
+            _save_job(job)
+            return job
+
+    _save_job(job)
+    # cache.add is atomic, so exactly one concurrent request claims the fingerprint.
+    # The claim expires with the job timeout, so a job whose worker died
+    # blocks new ones only that long.
+    timeout = settings.INVENTORY_REPORT_JOB_TIMEOUT
+    if not cache.add(_pending_key(fingerprint), job['id'], timeout):
+        existing = get_report_job(cache.get(_pending_key(fingerprint)))
+        if existing is not None and existing['status'] != 'failed':
+            cache.delete(job_key(job['id']))
+            return existing
+        cache.set(_pending_key(fingerprint), job['id'], timeout)
+
+    _run_in_background(_run_report_job, job['id'], fingerprint, refresh)
+    # Falls back to the local record when the cache dropped the write
+    return get_report_job(job['id']) or job
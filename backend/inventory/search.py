@@ -0,0 +1,165 @@
+# inventory/search.py
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+
+class SearchIndex:
+    """
+    Full-text index over a few text columns of one table.
+
+    SQLite uses an external-content FTS5 table kept in sync by triggers;
+    PostgreSQL uses a GIN expression index over a `simple` tsvector, which
+    the database maintains on every write.
+    """
+    def __init__(self, table, columns, weights):
+        self.table = table
+        self.columns = columns
+        self.weights = weights
+
+    @property
+    def fts_table(self):
+        return f"{self.table}_fts"
+
+    @property
+    def pg_index(self):
+        return f"{self.table}_search_idx"
+
+    def tsvector_sql(self):
+        document = " || ' ' || ".join(f'coalesce("{self.table}"."{c}", \'\')' for c in self.columns)
+        return f"to_tsvector('simple', {document})"
+
+    def sqlite_trigger_statements(self):
+        fts, table = self.fts_table, self.table
+        cols = ', '.join(self.columns)
+        new = ', '.join(f'new.{c}' for c in self.columns)
+        old = ', '.join(f'old.{c}' for c in self.columns)
+        return [
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});
+                INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new});
+            END""",
+        ]
+
+    def install(self, connection):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+                    f"{', '.join(self.columns)}, content='{self.table}', content_rowid='id', "
+                    f"tokenize='unicode61 remove_diacritics 2')"
+                )
+                for statement in self.sqlite_trigger_statements():
+                    cursor.execute(statement)
+                cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {self.pg_index} ON "{self.table}" '
+                    f"USING gin (({self.tsvector_sql()}))"
+                )
+
+    def uninstall(self, connection):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {self.fts_table}_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {self.fts_table}")
+            elif connection.vendor == 'postgresql':
+                cursor.execute(f"DROP INDEX IF EXISTS {self.pg_index}")
+
+    def restore_triggers(self, connection):
+        """
+        Recreate SQLite sync triggers dropped by a table rebuild in a later migration.
+        """
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.fts_table])
+            if cursor.fetchone() is None:
+                return
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [self.table]
+            )
+            if cursor.fetchone()[0] >= 3:
+                return
+            for statement in self.sqlite_trigger_statements():
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+
+    def search(self, queryset, tokens):
+        """
+        Filter `queryset` to rows matching every token (as a prefix), best match first.
+        """
+        vendor = connections[queryset.db].vendor
+        if vendor == 'sqlite':
+            fts = self.fts_table
+            weights = ', '.join(str(w) for w in self.weights)
+            # One MATCH joined on rowid; bm25() is only valid in that plain
+            # (ungrouped) join, so callers annotate aggregates after paging
+            return queryset.extra(
+                tables=[fts],
+                where=[f'{fts}.rowid = "{self.table}"."id"', f'{fts} MATCH %s'],
+                params=[' '.join(f'"{token}"*' for token in tokens)],
+                select={'search_rank': f'bm25({fts}, {weights})'},
+            ).order_by('search_rank', 'pk')
+        if vendor == 'postgresql':
+            query = ' & '.join(f'{token}:*' for token in tokens)
+            vector = self.tsvector_sql()
+            matches = RawSQL(f"{vector} @@ to_tsquery('simple', %s)", [query], output_field=BooleanField())
+            rank = RawSQL(f"ts_rank({vector}, to_tsquery('simple', %s))", [query], output_field=FloatField())
+            return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', 'pk')
+        return None
+
+
+SEARCH_INDEXES = {
+    'inventory_product': SearchIndex('inventory_product', ('name', 'sku', 'barcode'), (4.0, 2.0, 2.0)),
+    'inventory_customer': SearchIndex('inventory_customer', ('name', 'email', 'company'), (4.0, 1.0, 2.0)),
+}
+
+
+def install_search_indexes(connection):
+    for index in SEARCH_INDEXES.values():
+        index.install(connection)
+
+
+def uninstall_search_indexes(connection):
+    for index in SEARCH_INDEXES.values():
+        index.uninstall(connection)
+
+
+def restore_search_triggers(sender, using='default', **kwargs):
+    """
+    post_migrate hook: SQLite table rebuilds silently drop triggers.
+    """
+    for index in SEARCH_INDEXES.values():
+        index.restore_triggers(connections[using])
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    `?search=` backed by the database full-text index for indexed models,
+    falling back to DRF's `icontains` search elsewhere.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        index = SEARCH_INDEXES.get(queryset.model._meta.db_table)
+        if not terms or index is None:
+            return super().filter_queryset(request, queryset, view)
+
+        tokens = [token for term in terms for token in re.findall(r'\w+', term)]
+        if not tokens:
+            return queryset.none()
+        results = index.search(queryset, tokens)
+        if results is None:
+            return super().filter_queryset(request, queryset, view)
+        return results
@@ -1,22 +1,30 @@
 # inventory/serializers.py
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Sum, prefetch_related_objects
+from django.utils import timezone
+from decimal import Decimal
 from .models import (
     Category, Product, Customer, Order, OrderItem,
-    Bill, PurchaseOrder, WorkflowRule, Alert
+    Bill, PurchaseOrder, WorkflowRule, Alert, StockMovement
 )
+from .cache import bump_model_version
+from .stock import apply_stock_deltas, sync_order_stock
+from .timing import TimedSerializerMixin
+from .workflows import ConditionError, compile_condition
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category_name = serializers.CharField( read_only=True)
     stock_status = serializers.CharField(read_only=True)
-    total_value = serializers.DecimalField( max_digits=10, decimal_places=2, read_only=True)
+    total_value = serializers.DecimalField( max_digits=20, decimal_places=2, read_only=True)
 
     class Meta:
         model = Product
@@ -27,8 +35,50 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'stock_status', 'total_value']
 
+    def validate_barcode(self, value):
+        # Store missing barcodes as NULL so blanks never collide on lookup
+        if not value:
+            return None
+        duplicates = Product.objects.filter(barcode=value)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError("A product with this barcode already exists.")
+        return value
 
-class CustomerSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        # Product.save() records the quantity change in the ledger
+        product = super().update(instance, validated_data)
+        # stock_status is computed by the database and not returned by UPDATE
+        product.refresh_from_db(fields=['stock_status'])
+        return product
+
+
+class StockMovementSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    reason_display = serializers.CharField(source='get_reason_display', read_only=True)
+
+    class Meta:
+        model = StockMovement
+        fields = [
+            'id', 'product', 'product_name', 'delta', 'reason', 'reason_display',
+            'order', 'note', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(required=False)
+    barcode = serializers.CharField(max_length=50, required=False)
+    delta = serializers.IntegerField()
+
+    def validate(self, attrs):
+        if ('product_id' in attrs) == ('barcode' in attrs):
+            raise serializers.ValidationError("Provide exactly one of 'product_id' or 'barcode'.")
+        return attrs
+
+
+class CustomerSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     order_count = serializers.SerializerMethodField()
     total_order_value = serializers.SerializerMethodField()
 
@@ -41,13 +91,18 @@ class CustomerSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'order_count', 'total_order_value']
 
     def get_order_count(self, obj):
+        # Annotated by CustomerViewSet.get_queryset; freshly saved rows fall back to a query
+        if hasattr(obj, 'order_count'):
+            return obj.order_count
         return obj.orders.count()
 
     def get_total_order_value(self, obj):
-        return sum(order.total for order in obj.orders.all() if order.status != 'cancelled')
+        if hasattr(obj, 'total_order_value'):
+            return obj.total_order_value or 0
+        return obj.orders.exclude(status='cancelled').aggregate(total=Sum('total'))['total'] or 0
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     subtotal = serializers.DecimalField( max_digits=10, decimal_places=2, read_only=True)
 
@@ -59,18 +114,26 @@ class OrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'subtotal', 'product_name']
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, default=None)
+
+
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     customer_company = serializers.CharField(source='customer.company', read_only=True)
     items = OrderItemSerializer( many=True, read_only=True)
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
+    decrement_stock = serializers.BooleanField(write_only=True, required=False, default=False)
 
     class Meta:
         model = Order
         fields = [
             'id', 'type', 'type_display', 'customer', 'customer_name', 'customer_company',
-            'status', 'status_display', 'total', 'created_at', 'updated_at', 'items'
+            'status', 'status_display', 'total', 'created_at', 'updated_at', 'items',
+            'decrement_stock'
         ]
         read_only_fields = [
             'id', 'created_at', 'updated_at', 'type_display', 'status_display',
@@ -78,25 +141,77 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
     def create(self, validated_data):
-        # Handle items creation
-        items_data = self.initial_data.get('items', [])
-        order = Order.objects.create(**validated_data)
-        total = 0
-        for item_data in items_data:
-            product = Product.objects.get(id=item_data['product'])
-            item = OrderItem.objects.create(
-                order=order,
-                product=product,
-                quantity=item_data['quantity'],
-                price=item_data['price']
+        decrement_stock = validated_data.pop('decrement_stock', False)
+        lines = self._parse_items(self.initial_data.get('items', []))
+        product_ids = {line['product'] for line in lines}
+
+        with transaction.atomic():
+            # Primary-key order also gives concurrent lockers a consistent lock order
+            products = Product.objects.order_by('pk')
+            lock_stock = decrement_stock and validated_data.get('type') == 'sales'
+            if lock_stock:
+                # Row locks keep concurrent sales from overselling the same stock
+                products = products.select_for_update()
+            products = products.in_bulk(product_ids)
+            missing = sorted(product_ids - products.keys())
+            if missing:
+                raise serializers.ValidationError({'items': f"Unknown products: {missing}"})
+
+            items = []
+            total = Decimal('0.00')
+            needed = {}
+            for line in lines:
+                product = products[line['product']]
+                price = line['price'] if line['price'] is not None else product.price
+                items.append(OrderItem(product=product, quantity=line['quantity'], price=price))
+                total += line['quantity'] * price
+                needed[product.pk] = needed.get(product.pk, 0) + line['quantity']
+
+            if lock_stock:
+                short = [pk for pk, qty in needed.items() if products[pk].quantity < qty]
+                if short:
+                    raise serializers.ValidationError({'items': f"Insufficient stock for products: {sorted(short)}"})
+
+            order = Order.objects.create(
+                total=total, stock_committed_at=timezone.now() if lock_stock else None, **validated_data
             )
-            total += item.subtotal
-        order.total = total
-        order.save()
+            for item in items:
+                item.order = order
+            OrderItem.objects.bulk_create(items)
+            bump_model_version(OrderItem)  # bulk_create sends no post_save
+            if lock_stock:
+                apply_stock_deltas({pk: -qty for pk, qty in needed.items()}, reason='sale', order=order)
+            else:
+                sync_order_stock(order)
+        prefetch_related_objects([order], 'items__product')
+        return order
+
+    def update(self, instance, validated_data):
+        validated_data.pop('decrement_stock', None)
+        with transaction.atomic():
+            order = super().update(instance, validated_data)
+            sync_order_stock(order)
         return order
 
+    def _parse_items(self, items_data):
+        """
+        Validate raw item payloads into {product, quantity, price} dicts.
+        """
+        if not isinstance(items_data, list):
+            raise serializers.ValidationError({'items': "Expected a list of items."})
+        lines, errors = [], {}
+        for index, item_data in enumerate(items_data):
+            line = OrderLineSerializer(data=item_data)
+            if line.is_valid():
+                lines.append(line.validated_data)
+            else:
+                errors[index] = line.errors
+        if errors:
+            raise serializers.ValidationError({'items': errors})
+        return lines
 
-class BillSerializer(serializers.ModelSerializer):
+
+class BillSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.name', read_only=True)
     is_overdue = serializers.BooleanField( read_only=True)
 
@@ -109,7 +224,7 @@ class BillSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'vendor_name', 'is_overdue']
 
 
-class PurchaseOrderSerializer(serializers.ModelSerializer):
+class PurchaseOrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.name', read_only=True)
 
     class Meta:
@@ -121,19 +236,26 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'vendor_name']
 
 
-class WorkflowRuleSerializer(serializers.ModelSerializer):
+class WorkflowRuleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
 
     class Meta:
         model = WorkflowRule
         fields = [
             'id', 'name', 'description', 'trigger_condition', 'action',
-            'status', 'status_display', 'last_triggered', 'created_at', 'updated_at'
+            'status', 'status_display', 'last_triggered', 'last_swept', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'status_display']
+        read_only_fields = ['id', 'last_swept', 'created_at', 'updated_at', 'status_display']
+
+    def validate_trigger_condition(self, value):
+        try:
+            compile_condition(value)
+        except ConditionError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
 
 
-class AlertSerializer(serializers.ModelSerializer):
+class AlertSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
 
@@ -0,0 +1,38 @@
+# inventory/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import VERSIONED_MODELS, bump_model_version
+from .models import Category, Customer, Order, OrderItem, Product, WorkflowRule
+from .workflows import evaluate_on_commit
+
+# Listeners are registered per model: a delete listener disables Django's
+# fast bulk delete for its sender, which the stock ledger relies on.
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Customer)
+@receiver([post_save, post_delete], sender=Order)
+@receiver([post_save, post_delete], sender=OrderItem)
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=WorkflowRule)
+def invalidate_model_cache(sender, **kwargs):
+    """
+    Drop cached lookups and responses built from a model whenever one of its rows changes.
+    """
+    bump_model_version(sender)
+
+
+# WorkflowRule is left out: last_triggered/last_swept are written with
+# queryset updates that deliberately skip the bump (it would recompile rules)
+VERSIONED_MODELS.update({Category, Customer, Order, OrderItem, Product})
+
+
+@receiver(post_save, sender=Product)
+def evaluate_workflow_rules(sender, instance, **kwargs):
+    """
+    Check the active workflow rules against a product saved through the ORM.
+
+    Bulk writes (stock deltas, CSV imports) call evaluate_on_commit themselves.
+    """
+    evaluate_on_commit([instance.pk])
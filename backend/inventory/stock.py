@@ -0,0 +1,198 @@
+# inventory/stock.py
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+from rest_framework import serializers
+
+from .cache import bump_model_version
+from .models import Order, Product, StockMovement, StockSnapshot
+from .workflows import evaluate_on_commit
+
+# Order statuses at which an order's items have physically moved stock
+COMMITTED_STATUSES = {
+    'sales': {'confirmed', 'shipped', 'delivered'},
+    'purchase': {'delivered'},
+}
+
+
+def record_movements(deltas, reason='adjustment', order=None, note=''):
+    """
+    Append ledger rows for quantity changes that have already been applied.
+    """
+    now = timezone.now()
+    StockMovement.objects.bulk_create([
+        StockMovement(product_id=pk, delta=delta, reason=reason, order=order, note=note, created_at=now)
+        for pk, delta in deltas.items() if delta
+    ])
+
+
+def apply_stock_deltas(deltas, reason='adjustment', order=None, note=''):
+    """
+    Atomically add signed deltas to product quantities and log them in the ledger.
+
+    Args:
+        deltas (dict): {product_id: delta}. Each product gets a single
+                       `quantity = quantity + delta` UPDATE, guarded so that
+                       stock never goes negative.
+        reason (str): StockMovement reason recorded for every delta.
+        order (Order): Optional order the movements belong to.
+
+    Returns:
+        dict: {product_id: new_quantity} for every adjusted product.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+
+    now = timezone.now()
+    insufficient = []
+    with transaction.atomic():
+        # Fixed update order keeps concurrent batches from deadlocking
+        for pk in sorted(deltas):
+            delta = deltas[pk]
+            rows = Product.objects.filter(pk=pk)
+            if delta < 0:
+                rows = rows.filter(quantity__gte=-delta)
+            if not rows.update(quantity=F('quantity') + delta, updated_at=now):
+                insufficient.append(pk)
+        if insufficient:
+            raise serializers.ValidationError(
+                {"error": "Insufficient stock", "product_ids": insufficient}
+            )
+        record_movements(deltas, reason=reason, order=order, note=note)
+        quantities = dict(
+            Product.objects.filter(pk__in=deltas).values_list('id', 'quantity')
+        )
+    # Queryset updates bypass post_save, so invalidate and evaluate rules explicitly
+    bump_model_version(Product)
+    evaluate_on_commit(deltas)
+    return quantities
+
+
+def adjust_stock(entries):
+    """
+    Apply a batch of scanner adjustments in one transaction.
+
+    Args:
+        entries (list): Dicts with `delta` and either `product_id` or `barcode`.
+                        Entries for the same product are summed first.
+
+    Returns:
+        dict: {product_id: new_quantity}.
+    """
+    product_ids = {e['product_id'] for e in entries if e.get('product_id') is not None}
+    barcodes = {e['barcode'] for e in entries if e.get('barcode')}
+
+    known = Product.objects.filter(Q(pk__in=product_ids) | Q(barcode__in=barcodes))
+    by_barcode = {}
+    known_ids = set()
+    for pk, barcode in known.values_list('id', 'barcode'):
+        known_ids.add(pk)
+        if barcode:
+            by_barcode[barcode] = pk
+
+    unknown = [pk for pk in product_ids if pk not in known_ids]
+    unknown += [code for code in barcodes if code not in by_barcode]
+    if unknown:
+        raise serializers.ValidationError({"error": "Unknown products", "products": unknown})
+
+    deltas = {}
+    for entry in entries:
+        pk = entry.get('product_id')
+        if pk is None:
+            pk = by_barcode[entry['barcode']]
+        deltas[pk] = deltas.get(pk, 0) + entry['delta']
+    return apply_stock_deltas(deltas)
+
+
+def sync_order_stock(order):
+    """
+    Bring stock in line with an order's status.
+
+    Confirming a sales order (or receiving a purchase order) moves its items
+    out of (into) stock once; cancelling a committed order reverses it.
+    Whether stock has moved is read from `order.stock_committed_at`, never
+    from the ledger, whose movements compact_ledger() deletes.
+    """
+    committed = order.stock_committed_at is not None
+    if order.status in COMMITTED_STATUSES.get(order.type, ()) and not committed:
+        _move_order_stock(order, 1, 'sale' if order.type == 'sales' else 'receipt', timezone.now())
+    elif order.status == 'cancelled' and committed:
+        reverse_order_stock(order)
+
+
+def reverse_order_stock(order):
+    """
+    Undo the stock movement of a committed order (on cancellation or before
+    it is deleted); a no-op for orders that never moved stock.
+    """
+    if order.stock_committed_at is not None:
+        _move_order_stock(order, -1, 'reversal', None)
+
+
+def _move_order_stock(order, direction, reason, committed_at):
+    # Sales take stock out, purchases bring it in; a reversal undoes either
+    sign = -direction if order.type == 'sales' else direction
+    deltas = {}
+    for product_id, quantity in order.items.values_list('product', 'quantity'):
+        deltas[product_id] = deltas.get(product_id, 0) + sign * quantity
+    apply_stock_deltas(deltas, reason=reason, order=order)
+    order.stock_committed_at = committed_at
+    Order.objects.filter(pk=order.pk).update(stock_committed_at=committed_at)
+
+
+def stock_balance_as_of(product_id, when):
+    """
+    Stock level of a product at `when`: one snapshot read plus the bounded
+    tail of movements recorded after it.
+    """
+    snapshot = StockSnapshot.objects.filter(
+        product_id=product_id, taken_at__lte=when
+    ).order_by('-taken_at').values('quantity', 'taken_at').first()
+    movements = StockMovement.objects.filter(product_id=product_id, created_at__lte=when)
+    base = 0
+    if snapshot:
+        base = snapshot['quantity']
+        movements = movements.filter(created_at__gt=snapshot['taken_at'])
+    return base + (movements.aggregate(total=Sum('delta'))['total'] or 0)
+
+
+def compact_ledger(cutoff, batch_size=1000):
+    """
+    Fold movements recorded at or before `cutoff` into per-product snapshots.
+
+    Relies on the ledger invariant that no movement older than a product's
+    latest snapshot remains, so each product's new snapshot is its previous
+    snapshot plus the sum of its remaining movements up to `cutoff`.
+
+    Returns:
+        tuple: (snapshots_created, movements_deleted)
+    """
+    latest_snapshot = StockSnapshot.objects.filter(
+        product=OuterRef('pk'), taken_at__lte=cutoff
+    ).order_by('-taken_at').values('quantity')[:1]
+    product_ids = (
+        StockMovement.objects.filter(created_at__lte=cutoff)
+        .order_by('product').values_list('product', flat=True).distinct()
+    )
+    created = deleted = 0
+    last_id = 0
+    while True:
+        batch = list(product_ids.filter(product__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1]
+        with transaction.atomic():
+            movements = StockMovement.objects.filter(product__in=batch, created_at__lte=cutoff)
+            totals = dict(movements.values('product').annotate(total=Sum('delta')).values_list('product', 'total'))
+            bases = dict(
+                Product.objects.filter(pk__in=batch)
+                .annotate(base=Subquery(latest_snapshot)).values_list('id', 'base')
+            )
+            StockSnapshot.objects.bulk_create([
+                StockSnapshot(product_id=pk, quantity=(bases.get(pk) or 0) + total, taken_at=cutoff)
+                for pk, total in totals.items()
+            ], update_conflicts=True, unique_fields=['product', 'taken_at'], update_fields=['quantity'])
+            created += len(totals)
+            deleted += movements.delete()[0]
+    return created, deleted
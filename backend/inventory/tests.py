@@ -1,3 +1,964 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from importlib import import_module
+from decimal import Decimal
+from io import StringIO
+from tempfile import NamedTemporaryFile
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from .benchmarks import run_benchmarks
+from .models import (
+    Alert, Category, Customer, Order, OrderItem, Product, PurchaseOrder, StockMovement, WorkflowRule,
+)
+from .reports import job_key, merge_reports
+from .serializers import InventoryReportSerializer
+from .stock import COMMITTED_STATUSES, compact_ledger, stock_balance_as_of
+from .workflows import ConditionError, compile_condition, scheduler_lock
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class InventoryAPITestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user('tester', password='password')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Electronics')
+
+    def make_product(self, sku, **kwargs):
+        defaults = {'name': sku, 'category': self.category, 'quantity': 10, 'price': '5.00', 'min_stock': 2}
+        defaults.update(kwargs)
+        return Product.objects.create(sku=sku, **defaults)
+
+
+class ProductLookupTests(InventoryAPITestCase):
+    def test_lookup_by_barcode_and_sku(self):
+        product = self.make_product('SKU-1', barcode='4006381333931')
+        response = self.client.get('/api/products/lookup/', {'barcode': '4006381333931'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], product.id)
+        response = self.client.get('/api/products/lookup/', {'sku': 'SKU-1'})
+        self.assertEqual(response.data['id'], product.id)
+
+    def test_lookup_requires_exactly_one_key(self):
+        self.assertEqual(self.client.get('/api/products/lookup/').status_code, 400)
+        self.assertEqual(self.client.get('/api/products/lookup/', {'sku': 'X', 'barcode': 'Y'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/products/lookup/', {'sku': 'missing'}).status_code, 404)
+
+    def test_cached_lookup_is_invalidated_on_save(self):
+        product = self.make_product('SKU-1', barcode='111')
+        self.client.get('/api/products/lookup/', {'barcode': '111'})
+        with self.assertNumQueries(0):
+            self.client.get('/api/products/lookup/', {'barcode': '111'})
+        product.quantity = 99
+        product.save()
+        response = self.client.get('/api/products/lookup/', {'barcode': '111'})
+        self.assertEqual(response.data['quantity'], 99)
+
+        self.category.name = 'Gadgets'
+        self.category.save()
+        response = self.client.get('/api/products/lookup/', {'barcode': '111'})
+        self.assertEqual(response.data['category_name'], 'Gadgets')
+
+    def test_barcodes_are_unique_but_optional(self):
+        payload = {'name': 'Widget', 'quantity': 1, 'price': '1.00', 'min_stock': 0}
+        for sku in ('SKU-1', 'SKU-2'):
+            response = self.client.post('/api/products/', {**payload, 'sku': sku, 'barcode': ''}, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertIsNone(response.data['barcode'])
+        self.client.post('/api/products/', {**payload, 'sku': 'SKU-3', 'barcode': '111'}, format='json')
+        response = self.client.post('/api/products/', {**payload, 'sku': 'SKU-4', 'barcode': '111'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data), ['barcode'])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.make_product('SKU-5', barcode='111')
+
+
+class AdjustStockTests(InventoryAPITestCase):
+    def test_batch_is_applied_as_relative_updates(self):
+        first = self.make_product('SKU-1', barcode='111', quantity=10)
+        second = self.make_product('SKU-2', quantity=3)
+        response = self.client.post('/api/products/adjust-stock/', [
+            {'barcode': '111', 'delta': 2},
+            {'barcode': '111', 'delta': 1},
+            {'product_id': second.id, 'delta': -3},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.quantity, second.quantity), (13, 0))
+
+    def test_body_without_adjustments_is_rejected(self):
+        self.make_product('SKU-1', quantity=10)
+        response = self.client.post('/api/products/adjust-stock/', {'items': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.data)
+
+    def test_negative_stock_rolls_back_whole_batch(self):
+        first = self.make_product('SKU-1', quantity=10)
+        second = self.make_product('SKU-2', quantity=1)
+        response = self.client.post('/api/products/adjust-stock/', {'adjustments': [
+            {'product_id': first.id, 'delta': -5},
+            {'product_id': second.id, 'delta': -2},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        first.refresh_from_db()
+        self.assertEqual(first.quantity, 10)
+
+
+class DashboardSummaryTests(InventoryAPITestCase):
+    def test_summary_aggregates_in_constant_queries(self):
+        self.make_product('SKU-1', quantity=1, min_stock=2, price='10.00')
+        self.make_product('SKU-2', quantity=3, min_stock=2, price='1.00')
+        self.make_product('SKU-3', quantity=50, min_stock=2, price='2.00')
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        Order.objects.create(id='ORD-1', type='sales', customer=customer, status='delivered', total='40.00')
+        Order.objects.create(id='ORD-2', type='sales', customer=customer, status='cancelled', total='15.00')
+
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/dashboard/summary/')
+        self.assertEqual(response.status_code, 200)
+        products = response.data['products']
+        self.assertEqual(products['stock_status'], {'low': 1, 'medium': 1, 'good': 1})
+        self.assertEqual(products['inventory_value'], 113)
+        self.assertEqual(response.data['orders']['revenue'], 40)
+        self.assertEqual(len(response.data['recent_orders']), 2)
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/dashboard/summary/')
+
+
+class InventoryValuationTests(InventoryAPITestCase):
+    def test_total_value_overall_and_grouped(self):
+        self.make_product('SKU-1', quantity=2, price='10.00')
+        self.make_product('SKU-2', quantity=3, price='1.50', is_active=False)
+        self.make_product('SKU-3', quantity=4, price='1.00', category=None)
+
+        response = self.client.get('/api/products/total_value/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_value'], Decimal('28.50'))
+        self.assertEqual(
+            {g['category']: g['value'] for g in response.data['groups']},
+            {'Uncategorized': Decimal('4.00'), 'Electronics': Decimal('24.50')},
+        )
+
+        response = self.client.get('/api/products/total_value/', {'group_by': 'is_active'})
+        self.assertEqual(
+            {g['is_active']: g['value'] for g in response.data['groups']},
+            {False: Decimal('4.50'), True: Decimal('24.00')},
+        )
+
+    def test_list_uses_annotated_value(self):
+        self.make_product('SKU-1', quantity=2, price='10.00')
+        response = self.client.get('/api/products/')
+        row = response.data['results'][0]
+        self.assertEqual((row['total_value'], row['category_name']), ('20.00', 'Electronics'))
+
+
+class CursorPaginationTests(InventoryAPITestCase):
+    def test_cursor_pages_cover_every_row_once(self):
+        for i in range(30):
+            # Duplicate names exercise the id tie-breaker
+            self.make_product(f'SKU-{i}', name=f'Item {i % 3}')
+        seen = []
+        url, params = '/api/products/', {'paginator': 'cursor'}
+        while url:
+            response = self.client.get(url, params)
+            self.assertNotIn('count', response.data)
+            seen += [row['id'] for row in response.data['results']]
+            url, params = response.data['next'], None
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+
+    def test_page_number_pagination_is_default(self):
+        self.make_product('SKU-1')
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.data['count'], 1)
+
+
+class FullTextSearchTests(InventoryAPITestCase):
+    def test_product_search_is_ranked_and_tracks_updates(self):
+        laptop = self.make_product('LP-100', name='Laptop Pro', barcode='890100')
+        self.make_product('MS-200', name='Mouse for laptop')
+        self.make_product('KB-300', name='Keyboard')
+
+        response = self.client.get('/api/products/', {'search': 'lapt'})
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get('/api/products/', {'search': '890100'})
+        self.assertEqual([row['id'] for row in response.data['results']], [laptop.id])
+
+        laptop.name = 'Notebook Pro'
+        laptop.save()
+        response = self.client.get('/api/products/', {'search': 'notebook'})
+        self.assertEqual([row['id'] for row in response.data['results']], [laptop.id])
+        laptop.delete()
+        response = self.client.get('/api/products/', {'search': 'notebook'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_customer_search_covers_company(self):
+        Customer.objects.create(name='Ravi', email='ravi@example.com', company='Globex Traders')
+        Customer.objects.create(name='Asha', email='asha@example.com', company='Initech')
+        response = self.client.get('/api/customers/', {'search': 'globex'})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Ravi'])
+
+    def test_ranking_runs_one_match(self):
+        Product.objects.bulk_create([
+            Product(sku=f'SKU-{n}', name=f'Pro item {n}', category=self.category, quantity=1, price='1.00')
+            for n in range(2000)
+        ])
+        customer = Customer.objects.create(name='Pro Traders', email='pro@example.com')
+        Order.objects.create(id='ORD-1', type='sales', customer=customer, total='10.00')
+
+        response = self.client.get('/api/products/', {'search': 'pro'})
+        self.assertEqual(response.data['count'], 2000)
+        queryset = response.renderer_context['view'].filter_queryset(Product.objects.all())
+        sql, params = queryset.query.sql_with_params()
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                plan = ' | '.join(row[-1] for row in cursor.fetchall())
+            # Ranking must not re-run the MATCH per candidate row
+            self.assertNotIn('CORRELATED', plan)
+            self.assertEqual(plan.count('VIRTUAL TABLE'), 1, plan)
+
+        response = self.client.get('/api/customers/', {'search': 'pro'})
+        self.assertEqual(response.data['results'][0]['order_count'], 1)
+
+
+class CustomerOrderStatsTests(InventoryAPITestCase):
+    def test_list_query_count_is_independent_of_orders(self):
+        for i in range(5):
+            customer = Customer.objects.create(name=f'Customer {i}', email=f'c{i}@example.com')
+            for j, order_status in enumerate(['pending', 'delivered', 'cancelled']):
+                Order.objects.create(
+                    id=f'ORD-{i}-{j}', type='sales', customer=customer, status=order_status, total='10.00'
+                )
+
+        # COUNT for the paginator, the page, and one grouped stats query for it
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/customers/')
+        row = response.data['results'][0]
+        self.assertEqual(row['order_count'], 3)
+        self.assertEqual(row['total_order_value'], Decimal('20.00'))
+
+
+class OrderCreateTests(InventoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        self.products = [self.make_product(f'SKU-{i}', quantity=5, price='2.50') for i in range(20)]
+
+    def test_items_are_created_in_bulk(self):
+        items = [{'product': p.id, 'quantity': 2} for p in self.products]
+        items[0]['price'] = '1.00'
+        # Customer, savepoint pair, products, order, items and the response prefetch
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/orders/', {
+                'type': 'purchase', 'customer': self.customer.id, 'items': items,
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual(order.items.count(), 20)
+        self.assertEqual(order.total, Decimal('97.00'))
+
+    def test_sales_order_can_decrement_stock(self):
+        product = self.products[0]
+        payload = {
+            'type': 'sales', 'customer': self.customer.id, 'decrement_stock': True,
+            'items': [{'product': product.id, 'quantity': 3}, {'product': product.id, 'quantity': 3}],
+        }
+        response = self.client.post('/api/orders/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+        payload['items'].pop()
+        response = self.client.post('/api/orders/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 2)
+
+
+class StockLedgerTests(InventoryAPITestCase):
+    def test_order_lifecycle_and_adjustments_are_ledgered(self):
+        response = self.client.post('/api/products/', {
+            'name': 'Widget', 'sku': 'SKU-1', 'quantity': 10, 'price': '5.00', 'min_stock': 2,
+        }, format='json')
+        product = Product.objects.get(pk=response.data['id'])
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        order = Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        order.items.create(product=product, quantity=4, price='5.00')
+
+        self.client.patch('/api/orders/ORD-1/', {'status': 'confirmed'}, format='json')
+        self.client.patch('/api/orders/ORD-1/', {'status': 'shipped'}, format='json')
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 6)
+
+        self.client.patch('/api/orders/ORD-1/', {'status': 'cancelled'}, format='json')
+        self.client.post('/api/products/adjust-stock/', [{'product_id': product.id, 'delta': 5}], format='json')
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 15)
+        self.assertEqual(
+            list(StockMovement.objects.filter(product=product).values_list('reason', 'delta')),
+            [('adjustment', 10), ('sale', -4), ('reversal', 4), ('adjustment', 5)],
+        )
+
+    def test_balance_as_of_survives_compaction(self):
+        product = self.make_product('SKU-1', quantity=0)
+        start = timezone.now() - timedelta(days=10)
+        for day, delta in enumerate([5, 3, -2, 4]):
+            StockMovement.objects.create(product=product, delta=delta, created_at=start + timedelta(days=day))
+        as_of = start + timedelta(days=2, hours=1)
+        self.assertEqual(stock_balance_as_of(product.id, as_of), 6)
+
+        call_command('compact_stock_ledger', '--older-than', '8', stdout=StringIO())
+        self.assertEqual(StockMovement.objects.filter(product=product).count(), 1)
+        self.assertEqual(stock_balance_as_of(product.id, as_of), 6)
+        self.assertEqual(stock_balance_as_of(product.id, timezone.now()), 10)
+        response = self.client.get(f'/api/products/{product.id}/stock-balance/', {'as_of': as_of.isoformat()})
+        self.assertEqual(response.data['quantity'], 6)
+
+    def test_compaction_does_not_recommit_orders(self):
+        product = self.make_product('SKU-1', quantity=100)
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        order = Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        order.items.create(product=product, quantity=10, price='5.00')
+
+        self.client.patch('/api/orders/ORD-1/', {'status': 'confirmed'}, format='json')
+        compact_ledger(timezone.now())
+        self.assertFalse(StockMovement.objects.filter(order=order).exists())
+
+        self.client.patch('/api/orders/ORD-1/', {'status': 'shipped'}, format='json')
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 90)
+        self.client.patch('/api/orders/ORD-1/', {'status': 'cancelled'}, format='json')
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 100)
+
+    def test_deletes_and_orm_edits_keep_the_ledger_in_step(self):
+        product = self.make_product('SKU-1', quantity=10)
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        order = Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        order.items.create(product=product, quantity=4, price='5.00')
+        self.client.patch('/api/orders/ORD-1/', {'status': 'confirmed'}, format='json')
+
+        self.assertEqual(self.client.delete('/api/orders/ORD-1/').status_code, 204)
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 10)
+
+        product.quantity = 7
+        product.save()
+        self.assertEqual(stock_balance_as_of(product.id, timezone.now()), 7)
+        self.assertEqual(
+            list(StockMovement.objects.filter(product=product).values_list('reason', 'delta')),
+            [('adjustment', 10), ('sale', -4), ('reversal', 4), ('adjustment', -3)],
+        )
+
+    def test_migration_marks_orders_committed_before_the_ledger(self):
+        migration = import_module('inventory.migrations.0008_order_stock_committed_at')
+        product = self.make_product('SKU-1', quantity=10)
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        other = Customer.objects.create(name='Globex', email='globex@example.com')
+        Order.objects.create(id='ORD-1', type='sales', customer=customer, status='delivered')
+        Order.objects.create(id='ORD-2', type='purchase', customer=customer, status='shipped')
+        OrderItem.objects.create(order_id='ORD-1', product=product, quantity=4, price='5.00')
+
+        migration.mark_committed_orders(django_apps, None)
+        self.assertEqual(list(Order.objects.filter(stock_committed_at__isnull=False).values_list('id', flat=True)), ['ORD-1'])
+        response = self.client.patch('/api/orders/ORD-1/', {'customer': other.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 10)
+
+
+class StockStatusTests(InventoryAPITestCase):
+    def test_status_column_follows_bulk_updates(self):
+        product = self.make_product('SKU-1', quantity=10, min_stock=4)
+        self.make_product('SKU-2', quantity=1, min_stock=4)
+        self.assertEqual(Product.objects.get(pk=product.pk).stock_status, 'good')
+
+        self.client.post('/api/products/adjust-stock/', [{'product_id': product.id, 'delta': -7}], format='json')
+        self.assertEqual(Product.objects.get(pk=product.pk).stock_status, 'low')
+        response = self.client.get('/api/products/low_stock/')
+        self.assertEqual(len(response.data), 2)
+        response = self.client.get('/api/products/', {'stock_status': 'low'})
+        self.assertEqual(response.data['count'], 2)
+
+        response = self.client.patch(f'/api/products/{product.id}/', {'quantity': 6}, format='json')
+        self.assertEqual(response.data['stock_status'], 'medium')
+
+
+class ResponseCacheTests(InventoryAPITestCase):
+    def test_list_is_cached_until_a_dependency_changes(self):
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        self.assertEqual(self.client.get('/api/customers/')['X-Cache'], 'MISS')
+        # A hit never touches the database
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/customers/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['results'][0]['order_count'], 0)
+
+        Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        response = self.client.get('/api/customers/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['order_count'], 1)
+
+        stats = self.client.get('/api/cache-stats/').data
+        self.assertEqual(stats['customers'], {'hit': 1, 'miss': 2})
+
+    def test_bulk_stock_updates_invalidate_product_responses(self):
+        product = self.make_product('SKU-1', quantity=10)
+        self.client.get(f'/api/products/{product.id}/')
+        self.client.post('/api/products/adjust-stock/', [{'product_id': product.id, 'delta': 1}], format='json')
+        response = self.client.get(f'/api/products/{product.id}/')
+        self.assertEqual((response['X-Cache'], response.data['quantity']), ('MISS', 11))
+
+
+class ConditionalGetTests(InventoryAPITestCase):
+    def test_list_etag_changes_with_filtered_rows(self):
+        product = self.make_product('SKU-1')
+        response = self.client.get('/api/products/')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/products/').status_code, 200)  # cache HIT
+
+        self.make_product('SKU-2')
+        response = self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        product.delete()
+        self.assertEqual(self.client.get('/api/products/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_honours_if_modified_since(self):
+        response = self.client.get(f'/api/categories/{self.category.id}/')
+        last_modified = response['Last-Modified']
+        response = self.client.get(f'/api/categories/{self.category.id}/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_malformed_detail_key_is_not_found(self):
+        for url in ('/api/products/abc/', '/api/categories/abc/', '/api/customers/abc/'):
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_detail_with_dependencies_is_validated_by_etag_only(self):
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        response = self.client.get(f'/api/customers/{customer.id}/')
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        since = http_date(timezone.now().timestamp() + 60)
+
+        Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        response = self.client.get(
+            f'/api/customers/{customer.id}/', HTTP_IF_MODIFIED_SINCE=since, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['order_count'], 1)
+        response = self.client.get(f'/api/customers/{customer.id}/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+
+
+class ExportTests(InventoryAPITestCase):
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_product_csv_export_honours_filters(self):
+        self.make_product('SKU-1', quantity=0)
+        self.make_product('SKU-2', quantity=100)
+        response = self.client.get('/api/products/export/?format=csv&stock_status=low')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = self.read(response).splitlines()
+        self.assertTrue(lines[0].startswith('id,sku,name'))
+        self.assertEqual(len(lines), 2)
+        self.assertIn('SKU-1', lines[1])
+
+    def test_order_ndjson_export_has_row_per_item(self):
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        order = Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        for sku in ('SKU-1', 'SKU-2'):
+            OrderItem.objects.create(order=order, product=self.make_product(sku), quantity=2, price='5.00')
+        response = self.client.get('/api/orders/export/?format=ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['sku'] for row in rows], ['SKU-1', 'SKU-2'])
+        self.assertEqual(rows[0]['customer'], 'Acme')
+
+
+class CSVImportTests(InventoryAPITestCase):
+    def upload(self, url, content):
+        return self.client.post(url, {'file': SimpleUploadedFile('data.csv', content.encode())}, format='multipart')
+
+    def test_product_import_upserts_and_reports_row_errors(self):
+        existing = self.make_product('SKU-1', quantity=5)
+        response = self.upload('/api/products/import/', (
+            'sku,name,category,quantity,price\n'
+            'SKU-1,Renamed,Electronics,8,2.50\n'
+            'SKU-2,Cable,electronics,3,1.00\n'
+            'SKU-3,Broken,Nowhere,-1,abc\n'
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 4)
+        self.assertEqual(set(response.data['errors'][0]['errors']), {'category', 'quantity', 'price'})
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.name, existing.quantity), ('Renamed', 8))
+        self.assertEqual(Product.objects.get(sku='SKU-2').category, self.category)
+        deltas = dict(StockMovement.objects.values_list('product__sku', 'delta'))
+        self.assertEqual(deltas, {'SKU-1': 3, 'SKU-2': 3})
+
+    def test_product_import_enforces_column_limits(self):
+        response = self.upload('/api/products/import/', (
+            'sku,name,quantity,price\n'
+            'SKU-1,Too pricey,1,123456789012.5\n'
+            'SKU-2,Too many,99999999999,1.00\n'
+            'SKU-3,At the limits,2147483647,99999999.99\n'
+        ))
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([(error['row'], set(error['errors'])) for error in response.data['errors']],
+                         [(2, {'price'}), (3, {'quantity'})])
+        # The largest accepted row still serializes
+        self.assertEqual(self.client.get('/api/products/').status_code, 200)
+        self.assertEqual(self.client.get('/api/products/total_value/').status_code, 200)
+
+    def test_product_import_rejects_shared_barcodes(self):
+        self.make_product('SKU-1', barcode='111')
+        response = self.upload('/api/products/import/', (
+            'sku,name,barcode\n'
+            'SKU-1,Kept,111\n'
+            'SKU-2,Taken in database,111\n'
+            'SKU-3,Claims,222\n'
+            'SKU-4,Taken in file,222\n'
+            'SKU-5,No barcode,\n'
+            'SKU-6,Also none,\n'
+        ))
+        self.assertEqual((response.data['created'], response.data['updated']), (3, 1))
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 5])
+        self.assertIn('SKU-1', response.data['errors'][0]['errors']['barcode'])
+        self.assertIn('SKU-3', response.data['errors'][1]['errors']['barcode'])
+        self.assertEqual(Product.objects.filter(barcode__isnull=True).count(), 2)
+
+    def test_customer_import_command(self):
+        Customer.objects.create(name='Old', email='Sales@Acme.com')
+        with NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('email,name,type\nSales@Acme.com,Acme,vendor\nnew@example.com,New,customer\nbad,Bad,customer\n')
+        out, err = StringIO(), StringIO()
+        call_command('import_csv', 'customers', handle.name, stdout=out, stderr=err)
+        self.assertIn('Created 1, updated 1, rejected 1', out.getvalue())
+        self.assertIn('Row 4: email', err.getvalue())
+        self.assertEqual(Customer.objects.get(email='Sales@Acme.com').type, 'vendor')
+        self.assertEqual(Customer.objects.count(), 2)
+
+
+class SeedCommandTests(TestCase):
+    def seed(self, *args):
+        call_command('seed', *args, stdout=StringIO())
+        return list(Product.objects.order_by('sku').values_list('sku', 'name', 'quantity', 'price'))
+
+    def test_seed_is_deterministic_and_appends_without_wipe(self):
+        first = self.seed('--seed', '7')
+        self.assertEqual(first, self.seed('--seed', '7'))
+        self.assertEqual(Order.objects.count(), 30)
+        for order in Order.objects.all():
+            committed = order.status in COMMITTED_STATUSES[order.type]
+            self.assertEqual(order.stock_committed_at is not None, committed, order.pk)
+        self.assertEqual(
+            sum(StockMovement.objects.values_list('delta', flat=True)),
+            sum(quantity for _, _, quantity, _ in first)
+        )
+
+        self.seed('--seed', '7', '--scale', '2', '--no-wipe')
+        self.assertEqual((Product.objects.count(), Order.objects.count()), (150, 90))
+
+    def test_no_wipe_continues_after_deleted_rows(self):
+        self.seed()
+        OrderItem.objects.filter(product__sku='SKU-00000010').delete()
+        Product.objects.filter(sku='SKU-00000010').delete()
+        self.seed('--no-wipe')
+        self.assertEqual(Product.objects.count(), 99)
+        self.assertEqual(Product.objects.order_by('-sku').values_list('sku', flat=True)[0], 'SKU-00000100')
+
+
+class BenchmarkBudgetTests(TestCase):
+    def test_every_endpoint_is_within_query_budget(self):
+        # Timings depend on the machine; `manage.py benchmark_api` enforces them
+        report = run_benchmarks(repeat=1, check_time=False)
+        failures = {result['name']: result['violations'] for result in report['results'] if result['violations']}
+        self.assertEqual(failures, {})
+        self.assertIn('product-low-stock', {result['name'] for result in report['results']})
+
+
+class ServerTimingTests(InventoryAPITestCase):
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/products/'))
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_header_and_log_line_report_db_work(self):
+        self.make_product('SKU-1')
+        with self.assertLogs('inventory.timing', 'INFO') as logs:
+            response = self.client.get('/api/products/')
+        self.assertRegex(
+            response['Server-Timing'],
+            r'db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, render;dur=.*total;dur='
+        )
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry['view'], entry['status']), ('product-list', 200))
+        self.assertGreater(entry['db_queries'], 0)
+        self.assertGreaterEqual(entry['serialize_ms'], 0)
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_nested_serializers_are_timed_once(self):
+        product = self.make_product('SKU-1')
+        customer = Customer.objects.create(name='Acme', email='acme@example.com', type='customer')
+        order = Order.objects.create(id='ORD-1', type='sales', customer=customer)
+        OrderItem.objects.create(order=order, product=product, quantity=1, price='5.00')
+        with self.assertLogs('inventory.timing', 'INFO'), \
+                mock.patch('inventory.timing.RequestTimings.add', autospec=True) as add:
+            self.client.get('/api/orders/ORD-1/')
+        self.assertEqual([call.args[1] for call in add.call_args_list].count('serialize'), 1)
+
+
+class InventoryReportCacheTests(InventoryAPITestCase):
+    REPORT = {'summary': 'Healthy', 'low_stock_items': 0, 'total_value': 50.0, 'reorder_recommendations': [],
+              'trends': '', 'risk_level': 'low', 'action_items': []}
+
+    @mock.patch('inventory.reports.analyze_inventory', return_value=REPORT)
+    def test_report_is_reused_until_inputs_change(self, analyze):
+        product = self.make_product('SKU-1')
+        self.assertEqual(self.client.get('/api/inventory-report/')['X-Cache'], 'MISS')
+        response = self.client.get('/api/inventory-report/')
+        self.assertEqual((response['X-Cache'], response.data), ('HIT', self.REPORT))
+        self.assertEqual(analyze.call_count, 1)
+
+        self.assertEqual(self.client.get('/api/inventory-report/?refresh=1')['X-Cache'], 'MISS')
+        product.quantity = 1
+        product.save()
+        self.assertEqual(self.client.get('/api/inventory-report/')['X-Cache'], 'MISS')
+        self.assertEqual(analyze.call_count, 3)
+
+    @mock.patch('inventory.reports.analyze_inventory', return_value={'error': 'quota exceeded'})
+    def test_failed_analysis_is_not_cached(self, analyze):
+        self.make_product('SKU-1')
+        self.assertEqual(self.client.get('/api/inventory-report/').status_code, 500)
+        self.client.get('/api/inventory-report/')
+        self.assertEqual(analyze.call_count, 2)
+
+
+class InventoryReportJobTests(InventoryAPITestCase):
+    REPORT = InventoryReportCacheTests.REPORT
+
+    @mock.patch('inventory.reports.analyze_inventory', return_value=REPORT)
+    @mock.patch('inventory.reports._run_in_background')
+    def test_concurrent_requests_share_one_job(self, run_in_background, analyze):
+        self.make_product('SKU-1')
+        first = self.client.post('/api/inventory-report/')
+        second = self.client.post('/api/inventory-report/')
+        self.assertEqual((first.status_code, first.data['status']), (202, 'queued'))
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(run_in_background.call_count, 1)
+
+        func, *args = run_in_background.call_args.args
+        func(*args)
+        job = self.client.get(f"/api/inventory-report/jobs/{first.data['id']}/").data
+        self.assertEqual((job['status'], job['result']), ('done', self.REPORT))
+
+        # The finished report now serves both new jobs and the synchronous endpoint
+        third = self.client.post('/api/inventory-report/')
+        self.assertEqual((third.status_code, third.data['status']), (200, 'done'))
+        self.assertEqual(self.client.get('/api/inventory-report/')['X-Cache'], 'HIT')
+        self.assertEqual(analyze.call_count, 1)
+
+    @override_settings(INVENTORY_REPORT_WORKERS=0)
+    @mock.patch('inventory.reports.analyze_inventory', return_value={'error': 'quota exceeded'})
+    def test_failed_job_reports_error(self, analyze):
+        self.make_product('SKU-1')
+        job = self.client.post('/api/inventory-report/').data
+        self.assertEqual((job['status'], job['error']), ('failed', 'quota exceeded'))
+        self.assertEqual(self.client.get('/api/inventory-report/jobs/missing/').status_code, 404)
+
+    @mock.patch('inventory.reports._run_in_background')
+    def test_job_whose_worker_died_times_out(self, run_in_background):
+        from django.core.cache import cache
+        self.make_product('SKU-1')
+        first = self.client.post('/api/inventory-report/').data
+        stale = cache.get(job_key(first['id']))
+        stale['created_at'] = (timezone.now() - timedelta(hours=1)).isoformat()
+        cache.set(job_key(first['id']), stale)
+
+        polled = self.client.get(f"/api/inventory-report/jobs/{first['id']}/").data
+        self.assertEqual((polled['status'], polled['error']), ('failed', 'Report job timed out'))
+        second = self.client.post('/api/inventory-report/')
+        self.assertEqual((second.status_code, second.data['status']), (202, 'queued'))
+        self.assertNotEqual(second.data['id'], first['id'])
+        self.assertEqual(run_in_background.call_count, 2)
+
+    @mock.patch('inventory.reports._run_in_background')
+    @mock.patch('inventory.reports._save_job')
+    def test_job_survives_a_cache_that_drops_writes(self, save_job, run_in_background):
+        self.make_product('SKU-1')
+        response = self.client.post('/api/inventory-report/')
+        self.assertEqual((response.status_code, response.data['status']), (202, 'queued'))
+
+
+class ReportInputTests(InventoryAPITestCase):
+    @override_settings(INVENTORY_REPORT_SAMPLE_SIZE=2)
+    @mock.patch('inventory.reports.analyze_inventory', return_value=InventoryReportCacheTests.REPORT)
+    def test_analyser_gets_sql_aggregates_and_ranked_sample(self, analyze):
+        self.make_product('SKU-1', quantity=1, min_stock=5)
+        self.make_product('SKU-2', quantity=0, min_stock=10)
+        self.make_product('SKU-3', quantity=50, price='2.00')
+        Product.objects.create(sku='SKU-4', name='Loose', quantity=3, price='1.00')
+        with self.assertNumQueries(2):
+            self.client.get('/api/inventory-report/')
+
+        summary = analyze.call_args.args[0]
+        self.assertEqual((summary['total_products'], summary['low_stock_items']), (4, 2))
+        self.assertEqual(summary['total_value'], 108.0)
+        self.assertEqual(summary['categories']['Electronics'], {'count': 3, 'low': 2, 'value': 105.0})
+        self.assertEqual(summary['categories']['Uncategorized']['count'], 1)
+        self.assertEqual([p['sku'] for p in summary['sample_products']], ['SKU-2', 'SKU-1'])
+        self.assertEqual(summary['sample_products'][0]['category'], 'Electronics')
+
+
+@override_settings(INVENTORY_ANALYSER='inventory.analysers.LocalAnalyser')
+class LocalAnalyserTests(InventoryAPITestCase):
+    def test_offline_report_matches_schema_and_is_deterministic(self):
+        empty = self.make_product('SKU-1', quantity=0, min_stock=5)
+        self.make_product('SKU-2', quantity=40)
+        report = self.client.get('/api/inventory-report/?refresh=1').data
+        self.assertEqual(report, self.client.get('/api/inventory-report/?refresh=1').data)
+        self.assertTrue(InventoryReportSerializer(data=report).is_valid())
+        self.assertEqual((report['low_stock_items'], report['risk_level']), (1, 'high'))
+        self.assertEqual(
+            report['reorder_recommendations'],
+            [{'product_id': empty.id, 'suggested_qty': 10, 'urgency': 'high'}]
+        )
+
+
+@override_settings(INVENTORY_REPORT_CHUNK_THRESHOLD=0)
+class ChunkedReportTests(InventoryAPITestCase):
+    def fake_analyse(self, summary):
+        (category, totals), = summary['categories'].items()
+        return {
+            'summary': category, 'low_stock_items': totals['low'], 'total_value': totals['value'],
+            'reorder_recommendations': [
+                {'product_id': p['id'], 'suggested_qty': 5, 'urgency': 'high' if p['quantity'] == 0 else 'low'}
+                for p in summary['sample_products'] if p['quantity'] <= p['min_stock']
+            ],
+            'trends': f'{category} is steady', 'risk_level': 'high' if totals['low'] else 'low',
+            'action_items': [f'Check {category}', 'Review minimums'],
+        }
+
+    def test_categories_are_analysed_separately_and_cached(self):
+        books = Category.objects.create(name='Books')
+        empty = self.make_product('SKU-1', quantity=0)
+        self.make_product('SKU-2', quantity=50)
+        novel = self.make_product('SKU-3', quantity=20, category=books)
+
+        with mock.patch('inventory.reports.analyze_inventory', side_effect=self.fake_analyse) as analyze:
+            report = self.client.get('/api/inventory-report/').data
+            self.assertEqual(analyze.call_count, 2)
+            self.assertTrue(InventoryReportSerializer(data=report).is_valid())
+            self.assertEqual((report['low_stock_items'], report['total_value']), (1, 350.0))
+            self.assertEqual(report['reorder_recommendations'][0]['product_id'], empty.id)
+            self.assertEqual(report['action_items'], ['Check Electronics', 'Review minimums', 'Check Books'])
+            self.assertTrue(report['summary'].endswith('Highest risk: Electronics (high).'))
+
+            novel.quantity = 30
+            novel.save()
+            self.client.get('/api/inventory-report/')
+            self.assertEqual(analyze.call_count, 3)
+            self.assertEqual(analyze.call_args.args[0]['categories'].keys(), {'Books'})
+
+    @override_settings(INVENTORY_REPORT_CHUNK_TOKENS=1100)
+    def test_chunk_sample_respects_token_budget(self):
+        for n in range(40):
+            self.make_product(f'SKU-{n}', quantity=0)
+        self.make_product('BOOK-1', category=Category.objects.create(name='Books'))
+        with mock.patch('inventory.reports.analyze_inventory', side_effect=self.fake_analyse) as analyze:
+            self.client.get('/api/inventory-report/')
+        samples = {call.args[0]['sample_products'][0]['category']: len(call.args[0]['sample_products'])
+                   for call in analyze.call_args_list}
+        self.assertEqual(samples['Books'], 1)
+        self.assertTrue(0 < samples['Electronics'] < 25)
+
+    def test_unknown_risk_levels_count_as_low(self):
+        aggregates = [
+            {'category__name': 'Books', 'count': 3, 'low': 1, 'value': 10},
+            {'category__name': 'Toys', 'count': 1, 'low': 0, 'value': 5},
+        ]
+        report = merge_reports(aggregates, {
+            'Books': {'risk_level': 'critical', 'reorder_recommendations': [
+                {'product_id': 1, 'urgency': 'asap'}, {'product_id': 2, 'urgency': 'high'},
+            ]},
+            'Toys': {'risk_level': 'medium'},
+        })
+        self.assertEqual(report['risk_level'], 'low')
+        self.assertTrue(report['summary'].endswith('Highest risk: Toys (medium).'))
+        self.assertEqual([item['product_id'] for item in report['reorder_recommendations']], [2, 1])
+
+
+class ReorderSuggestionTests(InventoryAPITestCase):
+    def test_suggestions_follow_sales_history(self):
+        selling = self.make_product('SKU-1', quantity=10, min_stock=2)
+        self.make_product('SKU-2', quantity=50, min_stock=2)
+        idle = self.make_product('SKU-3', quantity=1, min_stock=5)
+        customer = Customer.objects.create(name='Acme', email='acme@example.com')
+        for order_id, status, days_ago in (('ORD-1', 'delivered', 3), ('ORD-2', 'cancelled', 3), ('ORD-3', 'delivered', 60)):
+            order = Order.objects.create(id=order_id, type='sales', customer=customer, status=status)
+            OrderItem.objects.create(order=order, product=selling, quantity=28, price='5.00')
+            Order.objects.filter(pk=order_id).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+        response = self.client.get('/api/products/reorder-suggestions/?method=sma')
+        rows = response.data['results']
+        self.assertEqual([row['product_id'] for row in rows], [selling.id, idle.id])
+        self.assertEqual(rows[0]['daily_demand'], 1.0)
+        self.assertEqual((rows[0]['reorder_point'], rows[0]['suggested_qty'], rows[0]['days_of_cover']), (29.61, 34, 10.0))
+        self.assertEqual((rows[1]['suggested_qty'], rows[1]['days_of_cover']), (4, None))
+
+        for query in ('lead_time_days=x', 'lead_time_days=-1', 'cover_days=-1', 'history_days=99999999'):
+            self.assertEqual(self.client.get(f'/api/products/reorder-suggestions/?{query}').status_code, 400, query)
+        response = self.client.get('/api/products/reorder-suggestions/?paginator=cursor&method=sma')
+        self.assertEqual([row['product_id'] for row in response.data['results']], [selling.id, idle.id])
+        filtered = self.client.get(f'/api/products/reorder-suggestions/?sku={idle.sku}').data['results']
+        self.assertEqual([row['product_id'] for row in filtered], [idle.id])
+        searched = self.client.get('/api/products/reorder-suggestions/?search=SKU-1&method=sma').data['results']
+        self.assertEqual([(row['product_id'], row['daily_demand']) for row in searched], [(selling.id, 1.0)])
+        # Outside the storage time zone days are bucketed through TruncDate instead
+        with timezone.override('Asia/Kolkata'):
+            local = self.client.get('/api/products/reorder-suggestions/?method=sma').data['results']
+        self.assertEqual(local, rows)
+
+
+class WorkflowEngineTests(InventoryAPITestCase):
+    def test_condition_grammar(self):
+        row = {'quantity': 4, 'min_stock': 5, 'price': Decimal('20'), 'stock_value': Decimal('80'), 'stock_status': 'low'}
+        for text, expected in (
+            ('Inventory Level < 10', True),
+            ('Stock Level < Reorder Point', True),
+            ('10 <= quantity', False),
+            ('stock_status = "low" and (price >= 100 or stock value > 50)', True),
+            ('not stock status != low', True),
+        ):
+            self.assertEqual(compile_condition(text)(row), expected, text)
+        for text in ('', 'quantity <', 'colour = 3', '3 < 4', 'price = low', '(quantity < 3'):
+            with self.assertRaises(ConditionError, msg=text):
+                compile_condition(text)
+
+    def test_sql_and_python_agree(self):
+        for n, (quantity, min_stock) in enumerate(((0, 5), (5, 5), (8, 5), (30, 5))):
+            self.make_product(f'SKU-{n}', quantity=quantity, min_stock=min_stock, price='3.00')
+        products = Product.objects.with_stock_value()
+        rows = list(products.values('id', 'quantity', 'min_stock', 'price', 'stock_value', 'stock_status'))
+        for text in ('Stock Level < Reorder Point', 'stock status = medium or stock value >= 90', 'not quantity != 5'):
+            condition = compile_condition(text)
+            self.assertEqual(
+                set(condition.filter(Product.objects.all()).values_list('id', flat=True)),
+                {row['id'] for row in rows if condition(row)},
+                text,
+            )
+
+    def test_stock_changes_trigger_rules(self):
+        low = WorkflowRule.objects.create(id='WF-001', name='Low', description='', status='active',
+                                          trigger_condition='Inventory Level < 10', action='Send Email Alert')
+        product = self.make_product('SKU-1', quantity=12)
+        self.make_product('SKU-2', quantity=1)  # below the threshold but untouched below
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/products/adjust-stock/', [{'product_id': product.id, 'delta': -1}], format='json')
+        low.refresh_from_db()
+        self.assertIsNone(low.last_triggered)
+
+        with mock.patch('inventory.workflows.logger') as log, self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/products/adjust-stock/', [{'product_id': product.id, 'delta': -5}], format='json')
+        low.refresh_from_db()
+        self.assertIsNotNone(low.last_triggered)
+        log.info.assert_called_once_with("Workflow rule %s triggered by %d product(s)", 'WF-001', 1)
+
+    def test_rules_recompile_on_save(self):
+        rule = WorkflowRule.objects.create(id='WF-001', name='Low', description='', status='active',
+                                           trigger_condition='quantity < 5', action='Send Email Alert')
+        product = self.make_product('SKU-1', quantity=8)
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertIsNone(WorkflowRule.objects.get(pk=rule.pk).last_triggered)
+
+        response = self.client.patch(f'/api/workflows/{rule.pk}/', {'trigger_condition': 'quantity < 10'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        with self.assertLogs('inventory.workflows', 'INFO'), self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertIsNotNone(WorkflowRule.objects.get(pk=rule.pk).last_triggered)
+
+        response = self.client.patch(f'/api/workflows/{rule.pk}/', {'trigger_condition': 'quantity <'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('trigger_condition', response.data)
+
+
+class WorkflowSchedulerTests(InventoryAPITestCase):
+    def setUp(self):
+        super().setUp()
+        for rule_id, condition, action in (
+            ('WF-001', 'Inventory Level < 10', 'Send Email Alert'),
+            ('WF-002', 'Stock Level < Reorder Point', 'Create Purchase Order'),
+        ):
+            WorkflowRule.objects.create(id=rule_id, name=rule_id, description='', status='active',
+                                        trigger_condition=condition, action=action)
+        vendor = Customer.objects.create(name='Supplier', email='supplier@example.com', type='vendor')
+        self.empty = self.make_product('SKU-1', quantity=0, min_stock=5, price='2.00')
+        self.low = self.make_product('SKU-2', quantity=3, min_stock=5, price='4.00')
+        self.make_product('SKU-3', quantity=50, min_stock=5)
+        self.make_product('SKU-4', quantity=1, min_stock=5, is_active=False)
+        order = Order.objects.create(id='ORD-1', type='purchase', customer=vendor, status='delivered')
+        for product in (self.empty, self.low):
+            OrderItem.objects.create(order=order, product=product, quantity=1, price='1.00')
+        self.vendor = vendor
+
+    def run_workflows(self, *args):
+        out = StringIO()
+        with self.assertLogs('inventory.workflows', 'INFO') as logs:
+            call_command('run_workflows', *args, stdout=out)
+        return [json.loads(line.split(':', 2)[2]) for line in logs.output]
+
+    def test_sweep_creates_alerts_and_purchase_orders(self):
+        results = self.run_workflows('--chunk-size', '1')
+        self.assertEqual([(r['rule'], r['matched']) for r in results], [('WF-001', 2), ('WF-002', 2)])
+        alerts = Alert.objects.order_by('id')
+        self.assertEqual([alert.type for alert in alerts], ['critical', 'warning'])
+        self.assertIn('SKU-1', alerts[0].description)
+        order = PurchaseOrder.objects.get()
+        self.assertEqual((order.vendor, order.status, order.items_count), (self.vendor, 'pending', 2))
+        self.assertEqual(order.total, Decimal('48.00'))  # 10 x 2.00 + 7 x 4.00
+        self.assertEqual(WorkflowRule.objects.filter(last_triggered__isnull=False).count(), 2)
+
+        # Unchanged products are not reported again unless the sweep is forced
+        results = self.run_workflows()
+        self.assertEqual([r['matched'] for r in results], [0, 0])
+        Product.objects.filter(pk=self.low.pk).update(quantity=2, updated_at=timezone.now())
+        self.assertEqual([r['matched'] for r in self.run_workflows()], [1, 1])
+        self.assertEqual([r['matched'] for r in self.run_workflows('--full')], [2, 2])
+        self.assertEqual(Alert.objects.count(), 5)
+
+    def test_single_scheduler(self):
+        with scheduler_lock() as acquired:
+            self.assertTrue(acquired)
+            with self.assertRaises(CommandError):
+                call_command('run_workflows', stdout=StringIO())
+        self.run_workflows()
@@ -0,0 +1,139 @@
+# inventory/timing.py
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('inventory.timing')
+
+_current = ContextVar('inventory_request_timings', default=None)
+_serializing = ContextVar('inventory_serializing', default=False)
+
+
+class RequestTimings:
+    """
+    Per-request counters. Also installed as a database execute wrapper.
+    """
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.spans = {}
+
+    def add(self, name, ms):
+        self.spans[name] = self.spans.get(name, 0.0) + ms
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.db_queries += 1
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the block's wall time, less the SQL time the `db` span already
+    counts, to span `name` of the current request.
+
+    A no-op outside a timed request, so it is safe to leave around external
+    calls (e.g. `with timed('ext'): client.models.generate_content(...)`).
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started, db_ms = time.perf_counter(), timings.db_ms
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000 - (timings.db_ms - db_ms))
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin that counts `to_representation` as the `serialize` span.
+
+    Only the outermost call is timed, so nested serializers are not counted
+    twice; a list adds up the time of its rows.
+    """
+
+    def to_representation(self, instance):
+        if _serializing.get() or _current.get() is None:
+            return super().to_representation(instance)
+        token = _serializing.set(True)
+        try:
+            with timed('serialize'):
+                return super().to_representation(instance)
+        finally:
+            _serializing.reset(token)
+
+
+class ServerTimingMiddleware:
+    """
+    Report where each request's time went, as a `Server-Timing` header and a
+    JSON log line on the `inventory.timing` logger.
+
+    Spans: `db` (SQL time and query count), `serialize` (serializers using
+    TimedSerializerMixin), `ext` (external calls wrapped in `timed('ext')`),
+    `render` (DRF response rendering), `app` (view code, i.e. the remainder)
+    and `total`. Disabled unless SERVER_TIMING_ENABLED is set; when it is
+    off, Django drops the middleware at startup.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        spans = dict(timings.spans)
+        spans['app'] = max(0.0, total_ms - timings.db_ms - sum(spans.values()))
+        response['Server-Timing'] = ', '.join(
+            [f'db;dur={timings.db_ms:.1f};desc="{timings.db_queries} queries"']
+            + [f'{name};dur={ms:.1f}' for name, ms in spans.items()]
+            + [f'total;dur={total_ms:.1f}']
+        )
+
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(timings.db_ms, 2),
+            'db_queries': timings.db_queries,
+            **{f'{name}_ms': round(ms, 2) for name, ms in spans.items()},
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        # Called just before DRF renders the body; the callback closes the span
+        timings = _current.get()
+        started = time.perf_counter()
+
+        def rendered(response):
+            timings.add('render', (time.perf_counter() - started) * 1000)
+
+        response.add_post_render_callback(rendered)
+        return response
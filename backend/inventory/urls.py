@@ -12,8 +12,12 @@ router.register(r'bills', views.BillViewSet)
 router.register(r'purchase-orders', views.PurchaseOrderViewSet)
 router.register(r'workflows', views.WorkflowRuleViewSet)
 router.register(r'alerts', views.AlertViewSet)
+router.register(r'stock-movements', views.StockMovementViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('dashboard/summary/', views.dashboard_summary, name='dashboard-summary'),
+    path('cache-stats/', views.cache_stats, name='cache-stats'),
     path('inventory-report/', views.generate_inventory_report, name='inventory-report'),
+    path('inventory-report/jobs/<str:job_id>/', views.inventory_report_job, name='inventory-report-job'),
 ]
\ No newline at end of file
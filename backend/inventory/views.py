@@ -1,29 +1,44 @@
 # inventory/views.py
 from rest_framework import viewsets, status
-from django.db import models
+from django.conf import settings
+from django.db import transaction
+from django.core.cache import cache
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from django_filters.rest_framework import DjangoFilterBackend
-from decimal import Decimal
-from django.db.models import Sum, Count
+from datetime import datetime, time
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.db.models import Sum, Count, F, Q
 from .models import (
-    Category, Product, Customer, Order, Bill,
-    PurchaseOrder, WorkflowRule, Alert
+    Category, Product, Customer, Order, OrderItem, Bill,
+    PurchaseOrder, WorkflowRule, Alert, StockMovement, STOCK_VALUE
 )
-from .gemini_ai_analyser import analyze_inventory
+from .cache import CachedResponseMixin, product_lookup_key, response_cache_stats
+from .conditional import ConditionalGetMixin
+from .exports import ExportMixin
+from .imports import ImportMixin
+from .reports import enqueue_report_job, get_inventory_report, get_report_job
 from .serializers import (
     CategorySerializer, ProductSerializer, CustomerSerializer,
     OrderSerializer, BillSerializer, PurchaseOrderSerializer,
-    WorkflowRuleSerializer, AlertSerializer, InventoryReportSerializer
+    WorkflowRuleSerializer, AlertSerializer, InventoryReportSerializer,
+    StockAdjustmentSerializer, StockMovementSerializer
 )
+from .filters import ProductFilter
+from .forecasting import FORECAST_DAY_LIMITS, FORECAST_DEFAULTS, reorder_suggestions
+from .search import FullTextSearchFilter
+from .stock import adjust_stock, reverse_order_stock, stock_balance_as_of
 from rest_framework.decorators import api_view, permission_classes
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     ViewSet for categories.
     """
+    cache_namespace = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
@@ -31,60 +46,268 @@ class CategoryViewSet(viewsets.ModelViewSet):
     filterset_fields = ['name']
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, CachedResponseMixin, ExportMixin, ImportMixin, viewsets.ModelViewSet):
     """
     ViewSet for products with custom actions for analytics.
     """
+    cache_namespace = 'products'
+    cache_dependencies = (Category,)
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['category', 'sku', 'is_active']
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+    filterset_class = ProductFilter
     search_fields = ['name', 'sku', 'barcode']
+    cursor_ordering = ('name', 'id')
+    export_columns = [
+        ('id', 'id'), ('sku', 'sku'), ('name', 'name'), ('barcode', 'barcode'),
+        ('category', 'category__name'), ('quantity', 'quantity'), ('price', 'price'),
+        ('min_stock', 'min_stock'), ('stock_status', 'stock_status'),
+        ('is_active', 'is_active'), ('updated_at', 'updated_at'),
+    ]
+    valuation_groups = {'category': 'category__name', 'is_active': 'is_active'}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method in SAFE_METHODS:
+            # Read paths take value and category name from the same SELECT
+            queryset = queryset.with_stock_value().annotate(category_name=F('category__name'))
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Find exactly one product by barcode or SKU (used by the scanner).
+        """
+        barcode = request.query_params.get('barcode')
+        sku = request.query_params.get('sku')
+        if bool(barcode) == bool(sku):
+            return Response(
+                {"error": "Provide exactly one of 'barcode' or 'sku'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        field, value = ('barcode', barcode) if barcode else ('sku', sku)
+        ttl = settings.PRODUCT_LOOKUP_CACHE_TTL
+        cache_key = product_lookup_key(field, value)
+        data = cache.get(cache_key) if ttl else None
+        if data is None:
+            matches = list(self.get_queryset().filter(**{field: value})[:2])
+            if not matches:
+                return Response({"error": f"No product with {field} '{value}'"}, status=status.HTTP_404_NOT_FOUND)
+            if len(matches) > 1:
+                return Response({"error": f"Multiple products share {field} '{value}'"}, status=status.HTTP_409_CONFLICT)
+            data = self.get_serializer(matches[0]).data
+            if ttl:
+                cache.set(cache_key, data, ttl)
+        return Response(data)
+
+    @action(detail=False, methods=['post'], url_path='adjust-stock')
+    def adjust_stock(self, request):
+        """
+        Apply a batch of relative stock changes from a scan session.
+
+        Accepts a list (or {"adjustments": [...]}) of
+        {"product_id" | "barcode", "delta"} entries, applied all-or-nothing.
+        """
+        entries = request.data
+        if isinstance(entries, dict):
+            if 'adjustments' not in entries:
+                return Response(
+                    {"error": "Send a list of adjustments or {\"adjustments\": [...]}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            entries = entries['adjustments']
+        serializer = StockAdjustmentSerializer(data=entries, many=True, max_length=5000)
+        serializer.is_valid(raise_exception=True)
+        quantities = adjust_stock(serializer.validated_data)
+        return Response({
+            'products': [{'id': pk, 'quantity': qty} for pk, qty in sorted(quantities.items())]
+        })
+
+    @action(detail=True, methods=['get'], url_path='stock-balance')
+    def stock_balance(self, request, pk=None):
+        """
+        Stock level as of `?as_of=<date or datetime>` (default: now), from the ledger.
+        """
+        product = self.get_object()
+        as_of = timezone.now()
+        raw = request.query_params.get('as_of')
+        if raw:
+            as_of = parse_datetime(raw)
+            if as_of is None and parse_date(raw) is not None:
+                # A bare date means the end of that day
+                as_of = datetime.combine(parse_date(raw), time.max)
+            if as_of is None:
+                return Response({"error": "Invalid 'as_of' value"}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(as_of):
+                as_of = timezone.make_aware(as_of)
+        return Response({
+            'product': product.pk,
+            'as_of': as_of,
+            'quantity': stock_balance_as_of(product.pk, as_of),
+        })
 
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """
         Get products with low stock.
         """
-        low_stock = self.queryset.filter(quantity__lte=models.F('min_stock'))
+        low_stock = self.filter_queryset(self.get_queryset()).filter(stock_status='low')
         serializer = self.get_serializer(low_stock, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='reorder-suggestions')
+    def reorder_suggestions(self, request):
+        """
+        Products due for reordering, from a demand forecast over sales history.
+
+        List filters apply. Forecast parameters (see FORECAST_DEFAULTS) can be
+        overridden, e.g. `?lead_time_days=10&service_level=0.99&method=sma`.
+        """
+        options = {}
+        try:
+            for name, default in FORECAST_DEFAULTS.items():
+                if name in request.query_params:
+                    options[name] = type(default)(request.query_params[name])
+        except ValueError:
+            return Response({"error": f"Invalid value for '{name}'."}, status=status.HTTP_400_BAD_REQUEST)
+        if options.get('method', 'ema') not in ('ema', 'sma'):
+            return Response({"error": "method must be 'ema' or 'sma'."}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < options.get('service_level', 0.5) < 1 or not 0 < options.get('alpha', 0.5) <= 1:
+            return Response({"error": "service_level and alpha must be between 0 and 1."}, status=status.HTTP_400_BAD_REQUEST)
+        for name, (low, high) in FORECAST_DAY_LIMITS.items():
+            if not low <= options.get(name, low) <= high:
+                return Response(
+                    {"error": f"{name} must be between {low} and {high}."}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        suggestions = reorder_suggestions(self.filter_queryset(Product.objects.all()), **options)
+        # A computed list has no queryset ordering to key a cursor on, so
+        # this action always pages by number
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(suggestions, request, view=self)
+        return paginator.get_paginated_response(page)
+
     @action(detail=False, methods=['get'])
     def total_value(self, request):
         """
-        Get total inventory value.
+        Get total inventory value, overall and per category.
+
+        `?group_by=category,is_active` selects the breakdown dimensions
+        (default: category). List filters such as `?is_active=true` apply.
         """
-        total = self.queryset.aggregate(total_value=Sum('total_value'))['total_value'] or 0
-        return Response({'total_value': total})
+        group_by = request.query_params.get('group_by', 'category').split(',')
+        unknown = [g for g in group_by if g not in self.valuation_groups]
+        if unknown:
+            return Response(
+                {"error": f"Unsupported group_by: {', '.join(unknown)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(Product.objects.all())
+        columns = [self.valuation_groups[g] for g in group_by]
+        groups = queryset.values(*columns).annotate(
+            count=Count('id'), value=Sum(STOCK_VALUE)
+        ).order_by(*columns)
+        breakdown = []
+        for row in groups:
+            entry = {g: row[column] for g, column in zip(group_by, columns)}
+            if 'category' in entry and entry['category'] is None:
+                entry['category'] = 'Uncategorized'
+            entry.update(count=row['count'], value=row['value'] or 0)
+            breakdown.append(entry)
+        return Response({
+            'total_value': queryset.stock_value_total(),
+            'groups': breakdown,
+        })
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class StockMovementViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only access to the stock movement ledger.
+    """
+    queryset = StockMovement.objects.select_related('product').order_by('-created_at', '-id')
+    serializer_class = StockMovementSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['product', 'reason', 'order']
+    cursor_ordering = ('-created_at', '-id')
+
+
+class CustomerViewSet(ConditionalGetMixin, CachedResponseMixin, ImportMixin, viewsets.ModelViewSet):
     """
     ViewSet for customers/vendors.
     """
+    cache_namespace = 'customers'
+    cache_dependencies = (Order,)
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['type', 'is_active']
     search_fields = ['name', 'email', 'company']
+    cursor_ordering = ('name', 'id')
 
+    order_stats = {
+        'order_count': Count('orders'),
+        'total_order_value': Sum('orders__total', filter=~Q(orders__status='cancelled')),
+    }
 
-class OrderViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            # Lists stay ungrouped (search ranks through an FTS join, which
+            # cannot be grouped); stats are added per page below
+            return queryset
+        return queryset.annotate(**self.order_stats)
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page:
+            # Order stats for the whole page in one grouped query
+            stats = Customer.objects.filter(pk__in=[customer.pk for customer in page]).order_by().values(
+                'pk'
+            ).annotate(**self.order_stats).values_list('pk', *self.order_stats)
+            by_pk = {pk: values for pk, *values in stats}
+            for customer in page:
+                customer.order_count, customer.total_order_value = by_pk[customer.pk]
+        return page
+
+
+class OrderViewSet(ConditionalGetMixin, CachedResponseMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for orders with nested items support.
     """
+    cache_namespace = 'orders'
+    cache_dependencies = (OrderItem, Customer, Product)
     queryset = Order.objects.prefetch_related('items__product', 'customer')
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['type', 'status', 'customer']
+    cursor_ordering = ('-created_at', '-id')
+    export_columns = [
+        ('order_id', 'order_id'), ('order_type', 'order__type'), ('order_status', 'order__status'),
+        ('customer', 'order__customer__name'), ('created_at', 'order__created_at'),
+        ('product_id', 'product_id'), ('sku', 'product__sku'), ('product', 'product__name'),
+        ('quantity', 'quantity'), ('price', 'price'),
+    ]
 
     def get_queryset(self):
         return super().get_queryset().select_related('customer')
 
+    def perform_destroy(self, instance):
+        # Deleting a committed order puts its stock back first, as cancelling does
+        with transaction.atomic():
+            reverse_order_stock(instance)
+            instance.delete()
+
+    def get_export_queryset(self):
+        # One row per line item of the filtered orders
+        orders = self.filter_queryset(Order.objects.all())
+        return OrderItem.objects.filter(order__in=orders.values('pk')).order_by('order_id', 'id')
+
     @action(detail=False, methods=['get'])
     def revenue(self, request):
         """
@@ -96,24 +319,30 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response({'revenue': revenue})
 
 
-class BillViewSet(viewsets.ModelViewSet):
+class BillViewSet(ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     """
     ViewSet for bills.
     """
+    cache_dependencies = (Customer,)
     queryset = Bill.objects.select_related('vendor')
     serializer_class = BillSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'vendor']
+    export_columns = [
+        ('id', 'id'), ('bill_number', 'bill_number'), ('vendor', 'vendor__name'),
+        ('date', 'date'), ('due_date', 'due_date'), ('status', 'status'), ('amount', 'amount'),
+    ]
 
     def get_queryset(self):
         return super().get_queryset().order_by('-due_date')
 
 
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
+class PurchaseOrderViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for purchase orders.
     """
+    cache_dependencies = (Customer,)
     queryset = PurchaseOrder.objects.select_related('vendor')
     serializer_class = PurchaseOrderSerializer
     permission_classes = [IsAuthenticated]
@@ -121,7 +350,7 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'vendor']
 
 
-class WorkflowRuleViewSet(viewsets.ModelViewSet):
+class WorkflowRuleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for workflow rules.
     """
@@ -155,46 +384,128 @@ class AlertViewSet(viewsets.ModelViewSet):
     
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """
+    Hit/miss counters of the API response cache.
+    """
+    namespaces = [
+        viewset.cache_namespace
+        for viewset in (CategoryViewSet, ProductViewSet, CustomerViewSet, OrderViewSet)
+    ]
+    return Response(response_cache_stats(namespaces))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_summary(request):
+    """
+    Dashboard and analytics figures computed with a handful of aggregate queries.
+    """
+    cache_key = 'inventory:dashboard-summary'
+    ttl = settings.DASHBOARD_CACHE_TTL
+    summary = cache.get(cache_key) if ttl else None
+    if summary is not None:
+        return Response(summary)
+
+    products = Product.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        low=Count('id', filter=Q(stock_status='low')),
+        medium=Count('id', filter=Q(stock_status='medium')),
+        good=Count('id', filter=Q(stock_status='good')),
+        inventory_value=Sum(STOCK_VALUE),
+    )
+    categories = Product.objects.values('category__name').annotate(
+        count=Count('id'),
+        value=Sum(STOCK_VALUE),
+    ).order_by('category__name')
+    customers = Customer.objects.aggregate(
+        total=Count('id'),
+        customers=Count('id', filter=Q(type='customer')),
+        vendors=Count('id', filter=Q(type='vendor')),
+    )
+    orders_by_status = Order.objects.values('status').annotate(
+        count=Count('id'),
+        sales_total=Sum('total', filter=Q(type='sales')),
+    ).order_by('status')
+    recent_orders = Order.objects.values(
+        'id', 'type', 'status', 'total', 'created_at', customer_name=F('customer__name')
+    )[:5]
+
+    by_status = {
+        row['status']: {'count': row['count'], 'revenue': row['sales_total'] or 0}
+        for row in orders_by_status
+    }
+    summary = {
+        'products': {
+            'total': products['total'],
+            'active': products['active'],
+            'inventory_value': products['inventory_value'] or 0,
+            'stock_status': {
+                'low': products['low'],
+                'medium': products['medium'],
+                'good': products['good'],
+            },
+        },
+        'categories': [
+            {'name': row['category__name'] or 'Uncategorized', 'count': row['count'], 'value': row['value'] or 0}
+            for row in categories
+        ],
+        'customers': customers,
+        'orders': {
+            'total': sum(row['count'] for row in by_status.values()),
+            'by_status': by_status,
+            'revenue': sum(
+                by_status.get(s, {}).get('revenue', 0) for s in ('confirmed', 'shipped', 'delivered')
+            ),
+        },
+        'recent_orders': list(recent_orders),
+    }
+    if ttl:
+        cache.set(cache_key, summary, ttl)
+    return Response(summary)
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
 def generate_inventory_report(request):
     """
     Generate AI-powered inventory behavior report using Gemini.
+
+    Served from cache while the catalog aggregates are unchanged;
+    `?refresh=1` forces a new analysis. POST queues the analysis in the
+    background and returns a job to poll instead of blocking the worker.
     """
     try:
-        # Fetch all products with relevant fields
-        products = Product.objects.values(
-            'id', 'name', 'sku', 'quantity', 'price', 'min_stock', 
-            'category__name'  # Assuming category FK with name
-        )
-        
-        # Convert to list of dicts for Gemini
-        def convert_decimal(obj):
-            if isinstance(obj, Decimal):
-                return float(obj)
-            if isinstance(obj, dict):
-                return {k: convert_decimal(v) for k, v in obj.items()}
-            if isinstance(obj, list):
-                return [convert_decimal(i) for i in obj]
-            return obj
-
-        products_data = convert_decimal(list(products))
-        
-        if not products_data:
-            return Response({"error": "No inventory data available"}, status=status.HTTP_404_NOT_FOUND)
+        refresh = request.query_params.get('refresh') in ('1', 'true')
+        if request.method == 'POST':
+            job = enqueue_report_job(refresh=refresh)
+            code = status.HTTP_200_OK if job['status'] in ('done', 'failed') else status.HTTP_202_ACCEPTED
+            return Response(job, status=code)
+
+        report_data, cached = get_inventory_report(refresh=refresh)
 
-        # Generate report
-        report_data = analyze_inventory(products_data)
+        if report_data is None:
+            return Response({"error": "No inventory data available"}, status=status.HTTP_404_NOT_FOUND)
 
         if "error" in report_data:
             return Response({"error": report_data["error"]}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # Serialize/validate
-        print(report_data)
-        return Response(report_data, status=status.HTTP_200_OK)
-        #serializer = InventoryReportSerializer(report_data)
-        if report_data():
-            return Response(report_data)
-        else:
-            return Response({"error": "Invalid report structure"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        response = Response(report_data, status=status.HTTP_200_OK)
+        response['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response
 
     except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def inventory_report_job(request, job_id):
+    """
+    Status of a background report job, with the report once it is done.
+    """
+    job = get_report_job(job_id)
+    if job is None:
+        return Response({"error": f"No report job '{job_id}'"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(job)
@@ -0,0 +1,471 @@
+# inventory/workflows.py
+import json
+import logging
+import operator
+import re
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from itertools import count
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .cache import get_model_version
+from .models import Alert, OrderItem, Product, PurchaseOrder, WorkflowRule
+
+logger = logging.getLogger('inventory.workflows')
+
+# Phrases a trigger condition may use for each product field (case-insensitive)
+FIELD_ALIASES = {
+    'quantity': 'quantity',
+    'stock': 'quantity',
+    'stock level': 'quantity',
+    'inventory': 'quantity',
+    'inventory level': 'quantity',
+    'min_stock': 'min_stock',
+    'min stock': 'min_stock',
+    'minimum stock': 'min_stock',
+    'minimum level': 'min_stock',
+    'reorder point': 'min_stock',
+    'reorder level': 'min_stock',
+    'price': 'price',
+    'unit price': 'price',
+    'stock_value': 'stock_value',
+    'stock value': 'stock_value',
+    'total value': 'stock_value',
+    'stock_status': 'stock_status',
+    'stock status': 'stock_status',
+}
+STATUS_VALUES = {value for value, _ in Product.STOCK_STATUS_CHOICES}
+
+# Values loaded per product when evaluating rules in Python
+ROW_FIELDS = ('id', 'quantity', 'min_stock', 'price', 'stock_value', 'stock_status')
+
+# operator -> (Python comparison, ORM lookup)
+OPERATORS = {
+    '<': (operator.lt, 'lt'),
+    '<=': (operator.le, 'lte'),
+    '>': (operator.gt, 'gt'),
+    '>=': (operator.ge, 'gte'),
+    '==': (operator.eq, 'exact'),
+    '!=': (operator.ne, 'exact'),
+}
+FLIPPED = {'<': '>', '<=': '>=', '>': '<', '>=': '<=', '==': '==', '!=': '!='}
+KEYWORDS = {'and', 'or', 'not'}
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d+)?)
+      | (?P<op><=|>=|==|!=|<|>|=)
+      | (?P<paren>[()])
+      | (?P<string>'[^']*'|"[^"]*")
+      | (?P<word>[A-Za-z_]+)
+    )""", re.VERBOSE)
+
+
+class ConditionError(ValueError):
+    """
+    A trigger condition that does not follow the grammar.
+    """
+
+
+class Condition:
+    """
+    A compiled trigger condition.
+
+    Call it with a product row (a dict with ROW_FIELDS) to test one product
+    in Python, or use `filter()` to select every matching product in SQL.
+    """
+
+    def __init__(self, source, predicate, q, fields):
+        self.source = source
+        self.predicate = predicate
+        self.q = q
+        self.fields = fields
+
+    def __call__(self, row):
+        return self.predicate(row)
+
+    def filter(self, products):
+        if 'stock_value' in self.fields:
+            products = products.with_stock_value()
+        return products.filter(self.q)
+
+
+def tokenize(text):
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKEN_RE.match(text, position)
+        if match is None:
+            raise ConditionError(f"Unexpected '{text[position:].strip()[:1]}' at position {position}.")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'word':
+            value = value.lower()
+            if value in KEYWORDS:
+                kind = value
+        elif kind == 'op' and value == '=':
+            value = '=='
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class Parser:
+    """
+    Recursive-descent parser for the trigger grammar:
+
+        condition  := conjunction ('or' conjunction)*
+        conjunction := negation ('and' negation)*
+        negation   := 'not' negation | '(' condition ')' | comparison
+        comparison := operand ('<' | '<=' | '>' | '>=' | '=' | '==' | '!=') operand
+        operand    := number | quoted string | field phrase | stock status value
+
+    e.g. "Inventory Level < 10", "Stock Level < Reorder Point",
+    "stock_status = low and (price >= 100 or stock value > 5000)".
+    """
+
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else None
+
+    def take(self, kind=None):
+        if self.peek() is None:
+            raise ConditionError("Condition ends unexpectedly.")
+        if kind and self.peek() != kind:
+            raise ConditionError(f"Expected {kind}, got '{self.tokens[self.position][1]}'.")
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ConditionError("Condition is empty.")
+        node = self.condition()
+        if self.peek() is not None:
+            raise ConditionError(f"Unexpected '{self.tokens[self.position][1]}'.")
+        return node
+
+    def condition(self):
+        node = self.conjunction()
+        while self.peek() == 'or':
+            self.take()
+            node = ('or', node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.peek() == 'and':
+            self.take()
+            node = ('and', node, self.negation())
+        return node
+
+    def negation(self):
+        if self.peek() == 'not':
+            self.take()
+            return ('not', self.negation())
+        if self.peek() == 'paren' and self.tokens[self.position][1] == '(':
+            self.take()
+            node = self.condition()
+            if self.take('paren')[1] != ')':
+                raise ConditionError("Expected ')'.")
+            return node
+        left = self.operand()
+        op = self.take('op')[1]
+        return ('compare', op, left, self.operand())
+
+    def operand(self):
+        kind, value = self.take()
+        if kind == 'number':
+            return ('value', Decimal(value) if '.' in value else int(value))
+        if kind == 'string':
+            return ('value', value[1:-1].lower())
+        if kind != 'word':
+            raise ConditionError(f"Expected a field or value, got '{value}'.")
+        words = [value]
+        while self.peek() == 'word':
+            words.append(self.take()[1])
+        phrase = ' '.join(words)
+        if phrase in FIELD_ALIASES:
+            return ('field', FIELD_ALIASES[phrase])
+        if phrase in STATUS_VALUES:
+            return ('value', phrase)
+        raise ConditionError(f"Unknown field '{phrase}'.")
+
+
+def _compile_comparison(op, left, right):
+    if left[0] == 'value' and right[0] == 'value':
+        raise ConditionError("A comparison needs at least one product field.")
+    if left[0] == 'value':
+        op, left, right = FLIPPED[op], right, left
+    field = left[1]
+    compare, lookup = OPERATORS[op]
+    status_value = right[0] == 'value' and isinstance(right[1], str)
+    if (field == 'stock_status' or status_value or right[1] == 'stock_status') and not (
+        field == 'stock_status' and status_value and op in ('==', '!=') and right[1] in STATUS_VALUES
+    ):
+        raise ConditionError(
+            f"Stock status can only be compared with = or != against one of: {', '.join(sorted(STATUS_VALUES))}."
+        )
+
+    if right[0] == 'field':
+        other = right[1]
+        predicate = lambda row: compare(row[field], row[other])
+        q = Q(**{f'{field}__{lookup}': F(other)})
+        fields = {field, other}
+    else:
+        value = right[1]
+        predicate = lambda row: compare(row[field], value)
+        q = Q(**{f'{field}__{lookup}': value})
+        fields = {field}
+    return predicate, ~q if op == '!=' else q, fields
+
+
+def _compile(node):
+    kind = node[0]
+    if kind == 'compare':
+        return _compile_comparison(*node[1:])
+    if kind == 'not':
+        predicate, q, fields = _compile(node[1])
+        return (lambda row: not predicate(row)), ~q, fields
+    left, left_q, left_fields = _compile(node[1])
+    right, right_q, right_fields = _compile(node[2])
+    if kind == 'and':
+        return (lambda row: left(row) and right(row)), left_q & right_q, left_fields | right_fields
+    return (lambda row: left(row) or right(row)), left_q | right_q, left_fields | right_fields
+
+
+def compile_condition(text):
+    """
+    Parse a trigger condition and compile it into a Condition.
+
+    Raises:
+        ConditionError: If the text does not follow the grammar (see Parser).
+    """
+    predicate, q, fields = _compile(Parser(text).parse())
+    return Condition(text, predicate, q, fields)
+
+
+# (WorkflowRule cache version, compiled active rules); process-local
+_active = (None, [])
+
+
+def active_rules():
+    """
+    Active rules with their compiled `condition`, parsed once per process.
+
+    The list is rebuilt whenever the WorkflowRule cache version moves, i.e.
+    after any rule is saved or deleted in any process. Rules whose condition
+    does not parse are logged and skipped.
+    """
+    global _active
+    version = get_model_version(WorkflowRule)
+    if _active[0] != version:
+        rules = []
+        for rule in WorkflowRule.objects.filter(status='active').order_by('id'):
+            try:
+                rule.condition = compile_condition(rule.trigger_condition)
+            except ConditionError as exc:
+                logger.warning("Skipping workflow rule %s: %s", rule.pk, exc)
+                continue
+            rules.append(rule)
+        _active = (version, rules)
+    return _active[1]
+
+
+def evaluate_rules(product_ids):
+    """
+    Evaluate the active rules against a set of changed products.
+
+    Only the given (active) products are loaded, in one query, so the cost
+    follows the size of the change rather than the catalog. Rules that match
+    at least one product get `last_triggered` set.
+
+    Returns:
+        dict: {rule_id: [matching product ids]} for the rules that fired.
+    """
+    product_ids = set(product_ids)
+    rules = active_rules() if product_ids else []
+    if not rules:
+        return {}
+    rows = list(
+        Product.objects.filter(pk__in=product_ids, is_active=True)
+        .with_stock_value().order_by().values(*ROW_FIELDS)
+    )
+    matches = {}
+    for rule in rules:
+        hits = [row['id'] for row in rows if rule.condition(row)]
+        if hits:
+            matches[rule.pk] = hits
+    if matches:
+        now = timezone.now()
+        # updated_at moves too so conditional GETs see the new last_triggered
+        WorkflowRule.objects.filter(pk__in=matches).update(last_triggered=now, updated_at=now)
+        for rule_id, hits in matches.items():
+            logger.info("Workflow rule %s triggered by %d product(s)", rule_id, len(hits))
+    return matches
+
+
+def evaluate_on_commit(product_ids):
+    """
+    Evaluate the active rules for `product_ids` once the current transaction
+    commits (immediately outside one). Failures are logged, never raised
+    into the write that caused them.
+    """
+    product_ids = set(product_ids)
+    transaction.on_commit(lambda: evaluate_rules(product_ids), robust=True)
+
+
+# Draft purchase orders restock to this multiple of min_stock (where stock_status turns 'good')
+REORDER_TARGET = 2
+
+SCHEDULER_LOCK_KEY = 'inventory:workflows:scheduler-lock'
+
+# Vendor of the most recent purchase order that included the product
+LAST_VENDOR = Subquery(
+    OrderItem.objects.filter(product=OuterRef('pk'), order__type='purchase')
+    .order_by('-order__created_at').values('order__customer')[:1]
+)
+
+
+def action_kind(action):
+    """
+    'purchase_order' for reorder actions (e.g. "Create Purchase Order"), 'alert' for anything else.
+    """
+    text = action.lower()
+    return 'purchase_order' if 'purchase order' in text or 'reorder' in text else 'alert'
+
+
+def _id_sequence(prefix, started):
+    # e.g. 'ALT-mgu2f1k0-000001': unique per run, sortable, within the 20-character keys
+    stamp, digits = int(started.timestamp() * 1000), ''
+    while stamp:
+        stamp, digit = divmod(stamp, 36)
+        digits = '0123456789abcdefghijklmnopqrstuvwxyz'[digit] + digits
+    return (f'{prefix}-{digits}-{n:06d}' for n in count(1))
+
+
+def _chunks(queryset, fields, size):
+    """
+    Rows of `queryset` in primary-key order, `size` at a time (keyset pagination).
+    """
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).order_by('pk').values(*fields)[:size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1]['id']
+
+
+def _create_alerts(rule, products, ids, chunk_size):
+    matched = 0
+    for rows in _chunks(products, ('id', 'name', 'sku', 'quantity', 'min_stock'), chunk_size):
+        Alert.objects.bulk_create([
+            Alert(
+                id=next(ids),
+                title=f"{rule.name}: {row['name']}"[:200],
+                description=(
+                    f"{row['sku']} matched \"{rule.trigger_condition}\" "
+                    f"(quantity {row['quantity']}, min stock {row['min_stock']})."
+                ),
+                type='critical' if row['quantity'] == 0 else 'warning',
+            )
+            for row in rows
+        ])
+        matched += len(rows)
+    return {'matched': matched, 'alerts': matched}
+
+
+def _create_purchase_orders(rule, products, ids, chunk_size, today):
+    # One pending order per vendor; products never purchased before have no vendor to order from
+    products = products.annotate(
+        vendor=LAST_VENDOR,
+        reorder_qty=Greatest(F('min_stock') * REORDER_TARGET - F('quantity'), Value(1)),
+    )
+    vendors, matched, without_vendor = {}, 0, 0
+    for rows in _chunks(products, ('id', 'price', 'reorder_qty', 'vendor'), chunk_size):
+        matched += len(rows)
+        for row in rows:
+            if row['vendor'] is None:
+                without_vendor += 1
+                continue
+            total, items = vendors.get(row['vendor'], (0, 0))
+            vendors[row['vendor']] = (total + row['price'] * row['reorder_qty'], items + 1)
+    PurchaseOrder.objects.bulk_create([
+        PurchaseOrder(id=next(ids), vendor_id=vendor, date=today, status='pending', total=total, items_count=items)
+        for vendor, (total, items) in sorted(vendors.items())
+    ])
+    return {'matched': matched, 'purchase_orders': len(vendors), 'without_vendor': without_vendor}
+
+
+@contextmanager
+def scheduler_lock(timeout=None):
+    """
+    Hold the run_workflows lock for the block; yields False if another
+    scheduler already holds it. Needs a cache shared between processes
+    (Redis in production) for the lock to be global.
+    """
+    token = uuid4().hex
+    acquired = cache.add(SCHEDULER_LOCK_KEY, token, timeout or settings.WORKFLOW_LOCK_TTL)
+    try:
+        yield acquired
+    finally:
+        if acquired and cache.get(SCHEDULER_LOCK_KEY) == token:
+            cache.delete(SCHEDULER_LOCK_KEY)
+
+
+def run_workflows(full=False, chunk_size=None):
+    """
+    Sweep the catalog with every active rule and carry out its action.
+
+    Each rule's condition runs as SQL over active products, read in
+    primary-key chunks. Alert rules get one Alert per matching product;
+    reorder rules get one pending PurchaseOrder per vendor. Unless `full`,
+    only products changed since the rule's previous sweep are considered,
+    so a product that stays low is not reported on every run. Callers
+    should hold scheduler_lock().
+
+    Returns:
+        list: One result dict per rule (counts and elapsed ms), also logged
+              as JSON on the `inventory.workflows` logger.
+    """
+    chunk_size = chunk_size or settings.WORKFLOW_SWEEP_CHUNK_SIZE
+    started = timezone.now()
+    rules = active_rules()
+    swept = dict(WorkflowRule.objects.filter(pk__in=[rule.pk for rule in rules]).values_list('id', 'last_swept'))
+    alert_ids, order_ids = _id_sequence('ALT', started), _id_sequence('PO', started)
+
+    results = []
+    for rule in rules:
+        timer = time.perf_counter()
+        products = Product.objects.filter(is_active=True)
+        if not full and swept.get(rule.pk):
+            products = products.filter(updated_at__gt=swept[rule.pk])
+        products = rule.condition.filter(products).order_by()
+        kind = action_kind(rule.action)
+
+        with transaction.atomic():
+            if kind == 'purchase_order':
+                counts = _create_purchase_orders(rule, products, order_ids, chunk_size, started.date())
+            else:
+                counts = _create_alerts(rule, products, alert_ids, chunk_size)
+            updates = {'last_swept': started, 'updated_at': timezone.now()}
+            if counts['matched']:
+                updates['last_triggered'] = started
+            WorkflowRule.objects.filter(pk=rule.pk).update(**updates)
+
+        result = {'rule': rule.pk, 'action': kind, **counts, 'ms': round((time.perf_counter() - timer) * 1000, 2)}
+        logger.info(json.dumps(result))
+        results.append(result)
+    return results